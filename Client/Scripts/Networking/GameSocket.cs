@@ -38,6 +38,7 @@ public partial class GameSocket : Node
 	private const double PositionSendRate = 0.1; // 100ms
 	private Vector2 _lastSentPos = Vector2.Zero;
 	private bool _joinedWorld = false;
+	private string _characterId = "";
 
 	private string _serverUrl = "";
 	private string _authToken = "";
@@ -152,6 +153,7 @@ public partial class GameSocket : Node
 			["y"] = position.Y,
 		};
 		SendEvent("join_world", data);
+		_characterId = characterId;
 		_lastSentPos = position;
 		_joinedWorld = true;
 		GD.Print($"[GameSocket] Joined world as {characterId}");
@@ -299,9 +301,24 @@ public partial class GameSocket : Node
 				case "player_joined":
 					HandlePlayerJoined(eventData);
 					break;
+				case "world_snapshot":
+					// Everyone already in the world, sent once after join_world: [{id, name, rank, allegiance, x, y}, ...]
+					foreach (var other in eventData.EnumerateArray())
+					{
+						HandlePlayerJoined(other);
+					}
+					break;
 				case "player_moved":
 					HandlePlayerMoved(eventData);
 					break;
+				case "player_moved_batch":
+					// One array per server tick: [{id, x, y}, ...] — includes our own position
+					foreach (var move in eventData.EnumerateArray())
+					{
+						if (move.GetProperty("id").GetString() != _characterId)
+							HandlePlayerMoved(move);
+					}
+					break;
 				case "player_left":
 					string leftId = eventData.GetProperty("id").GetString();
 					EmitSignal(SignalName.PlayerLeft, leftId);
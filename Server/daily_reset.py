@@ -9,47 +9,71 @@ Rules (per design doc + user clarification):
   - Server-authoritative — client cannot grant itself TP
 """
 
-from datetime import datetime, timezone, timedelta
+import time
+from datetime import datetime, time as dt_time, timezone, timedelta
 
 # 12:00 PM EST = 17:00 UTC
 RESET_HOUR_UTC = 17
 
 # TP award schedule per RP session
 TP_SCHEDULE = [2, 2, 1]  # 1st→+2, 2nd→+2, 3rd→+1 = max 5 for Lv 1-9
+MAX_DAILY_TP = 5         # highest daily_tp_cap (Lv 1-9)
+
+# AWARD_TABLE[session_idx][tp_left_today] → award already clamped to the daily cap.
+# Last row covers every session past the schedule (always 0).
+AWARD_TABLE = tuple(
+    tuple(min(TP_SCHEDULE[i] if i < len(TP_SCHEDULE) else 0, left) for left in range(MAX_DAILY_TP + 1))
+    for i in range(len(TP_SCHEDULE) + 1)
+)
+
+
+# (period, unix time it ends) — every request asks, but the answer only changes once a day
+_period_cache = (None, 0.0)
 
 
 def get_current_reset_period():
     """
-    ISO date string for the current training period.
+    Date of the current training period (compared directly against the Date columns).
     The "day" flips at 17:00 UTC (12:00 PM EST).
     Before 17:00 UTC → yesterday's period. At/after → today's period.
+    Cached until the next flip, so the usual call is one time.time() comparison.
     """
+    global _period_cache
+    period_date, ends_at = _period_cache
+    if time.time() < ends_at:
+        return period_date
+
     now = datetime.now(timezone.utc)
     if now.hour < RESET_HOUR_UTC:
         period_date = now.date() - timedelta(days=1)
     else:
         period_date = now.date()
-    return period_date.isoformat()
+    next_reset = datetime.combine(period_date + timedelta(days=1), dt_time(RESET_HOUR_UTC), timezone.utc)
+    _period_cache = (period_date, next_reset.timestamp())
+    return period_date
 
 
 def seconds_until_next_reset():
-    """Seconds until the next 17:00 UTC reset."""
-    now = datetime.now(timezone.utc)
-    today_reset = now.replace(hour=RESET_HOUR_UTC, minute=0, second=0, microsecond=0)
-    if now >= today_reset:
-        next_reset = today_reset + timedelta(days=1)
-    else:
-        next_reset = today_reset
-    return int((next_reset - now).total_seconds())
+    """Seconds until the next 17:00 UTC reset — the end of the cached period."""
+    get_current_reset_period()  # rolls _period_cache over if the reset just passed
+    return int(_period_cache[1] - time.time())
+
+
+def next_reset_at():
+    """Unix time of the next 17:00 UTC reset — fixed for the whole period, unlike the countdown."""
+    get_current_reset_period()
+    return int(_period_cache[1])
 
 
-def check_and_reset(character):
+def check_and_reset(character, current_period=None):
     """
     Check if this character's daily RP counters need resetting.
     TP bank CARRIES OVER — only daily earning counters reset.
+    Pass current_period when checking many characters to read the clock once.
     Returns True if a reset occurred.
     """
-    current_period = get_current_reset_period()
+    if current_period is None:
+        current_period = get_current_reset_period()
 
     if character.last_reset_date == current_period:
         return False
@@ -61,7 +85,7 @@ def check_and_reset(character):
     return True
 
 
-def award_rp_session_tp(character):
+def award_rp_session_tp(character, current_period=None):
     """
     Award TP for completing a valid RP session.
 
@@ -73,22 +97,14 @@ def award_rp_session_tp(character):
 
     Returns: (tp_awarded, total_earned_today, at_cap)
     """
-    check_and_reset(character)
+    check_and_reset(character, current_period)
 
     cap = character.daily_tp_cap
     already_earned = character.daily_tp_earned
 
-    if already_earned >= cap:
-        return (0, already_earned, True)
-
-    session_idx = character.daily_rp_sessions
-    if session_idx < len(TP_SCHEDULE):
-        award = TP_SCHEDULE[session_idx]
-    else:
-        award = 0
-
-    # Clamp to daily cap
-    award = min(award, cap - already_earned)
+    tp_left = min(max(cap - already_earned, 0), MAX_DAILY_TP)
+    session_idx = min(character.daily_rp_sessions, len(TP_SCHEDULE))
+    award = AWARD_TABLE[session_idx][tp_left]
 
     if award <= 0:
         return (0, already_earned, True)
@@ -113,9 +129,32 @@ def calc_training_cost(stat_value, lowest_stat):
     return 1       # 100% efficiency
 
 
+# (gap where the tier ends, TP per point) — same breakpoints as calc_training_cost
+TRAINING_COST_TIERS = ((10, 1), (20, 2), (None, 4))
+
+
+def plan_training(stat_value, lowest_stat, points, tp_available):
+    """
+    (points_gained, tp_spent) for up to `points` on one stat — what buying them one at a
+    time with calc_training_cost would give, computed per cost tier instead of per point.
+    """
+    gap = stat_value - lowest_stat
+    gained = spent = 0
+    for tier_end, cost in TRAINING_COST_TIERS:
+        if tier_end is not None and gap >= tier_end:
+            continue
+        room = points - gained
+        if tier_end is not None:
+            room = min(room, tier_end - gap)
+        n = min(room, (tp_available - spent) // cost)
+        gained += n
+        spent += n * cost
+        gap += n
+        if n < room:  # out of points or TP — later tiers only cost more
+            break
+    return gained, spent
+
+
 def get_lowest_stat(character):
     """Return the lowest of the 6 training stats."""
-    return min(
-        character.strength, character.vitality, character.agility,
-        character.dexterity, character.mind, character.ether_control
-    )
+    return min(character.stat_values)
@@ -0,0 +1,23 @@
+"""
+orjson-backed JSON provider for Flask — Rust encoder, native datetime/UUID support.
+Installed in create_app() via app.json = OrjsonProvider(app).
+"""
+import orjson
+from flask.json.provider import JSONProvider
+
+# OPT_NAIVE_UTC: SQLite hands back naive datetimes. Response dicts are str-keyed, so
+# orjson stays on its fast path (no OPT_NON_STR_KEYS).
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC
+
+
+class OrjsonProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response — skips the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=ORJSON_OPTIONS), mimetype="application/json")
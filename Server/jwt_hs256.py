@@ -0,0 +1,64 @@
+"""
+Minimal HS256 JWT encode/decode — stdlib HMAC (OpenSSL) + orjson instead of PyJWT's
+generic pipeline. Same token format, so tokens issued by either side verify on the other.
+Raises PyJWT's exception classes, so callers' except clauses are unchanged.
+"""
+import base64
+import hashlib
+import hmac
+import time
+from datetime import datetime
+
+import orjson
+from jwt import DecodeError, ExpiredSignatureError, InvalidAlgorithmError, InvalidSignatureError
+
+# b64url('{"alg":"HS256","typ":"JWT"}') — the only header we ever issue
+_HEADER_SEGMENT = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+_TIME_CLAIMS = ("exp", "iat", "nbf")
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+
+def _b64decode(segment):
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+def _sign(key, signing_input):
+    return hmac.new(key.encode(), signing_input, hashlib.sha256).digest()
+
+
+def encode(payload, key):
+    """Sign payload. datetime exp/iat/nbf become Unix timestamps, as PyJWT does."""
+    for claim in _TIME_CLAIMS:
+        if isinstance(payload.get(claim), datetime):
+            payload = {**payload, claim: int(payload[claim].timestamp())}
+    signing_input = _HEADER_SEGMENT + b"." + _b64encode(orjson.dumps(payload))
+    return (signing_input + b"." + _b64encode(_sign(key, signing_input))).decode()
+
+
+def decode(token, key):
+    """Verify signature + exp and return the payload dict."""
+    try:
+        header_segment, payload_segment, signature_segment = token.encode("ascii").split(b".")
+        header = orjson.loads(_b64decode(header_segment))
+        payload = orjson.loads(_b64decode(payload_segment))
+        signature = _b64decode(signature_segment)
+    except ValueError:  # wrong segment count, bad base64, bad JSON, non-ASCII
+        raise DecodeError("Malformed token")
+    if not isinstance(header, dict) or not isinstance(payload, dict):
+        raise DecodeError("Malformed token")
+    if header.get("alg") != "HS256":
+        raise InvalidAlgorithmError("The specified alg value is not allowed")
+
+    if not hmac.compare_digest(signature, _sign(key, header_segment + b"." + payload_segment)):
+        raise InvalidSignatureError("Signature verification failed")
+
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise DecodeError("Expiration Time claim (exp) must be an integer.")
+        if exp <= time.time():
+            raise ExpiredSignatureError("Signature has expired")
+    return payload
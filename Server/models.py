@@ -7,52 +7,163 @@ RPP economy: RP-earned points for purchasing abilities
 Abilities: Learned skills + spells persisted per character
 Equipment: Item definitions + character gear slots + inventory
 """
+import time
 import uuid
-from datetime import datetime, timezone
-
-from werkzeug.security import generate_password_hash, check_password_hash
+from collections import namedtuple
+from operator import attrgetter, itemgetter
+from types import MappingProxyType
+
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from sqlalchemy import Integer, case, cast, event, exists, func, select
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import column_property, raiseload, selectinload
+from werkzeug.security import check_password_hash
 
 from database import db
+from json_provider import ORJSON_OPTIONS
+
+
+DerivedStats = namedtuple("DerivedStats", [
+    "character_level", "max_hp", "max_stamina", "max_aether",
+    "hp_regen", "stamina_regen", "aether_regen",
+    "atk", "eatk", "defense", "edef", "avd", "acc", "crit_percent",
+    "move", "jump", "base_rt", "daily_tp_cap",
+])
+
+
+# Plain columns serialized as-is — read from __dict__, or one C-level attrgetter call if expired
+CHARACTER_FIELDS = (
+    "slot", "name", "race", "city", "allegiance", "rp_rank", "bio", "play_by_path",
+    "strength", "vitality", "dexterity", "agility", "ether_control", "mind",
+    "training_points_bank", "daily_tp_earned", "daily_rp_sessions", "last_reset_date",
+    "current_hp", "current_stamina", "current_aether", "rpp", "daily_rpp_earned",
+    "created_at", "updated_at",
+)
+STAT_FIELDS = ("strength", "vitality", "dexterity", "agility", "ether_control", "mind")
+SUMMARY_FIELDS = (
+    "slot", "name", "race", "city", "rp_rank",
+    "strength", "vitality", "dexterity", "agility", "ether_control", "mind",
+)
+
+# ─── RACE MODIFIERS (mirrors RaceData.cs) ────────────────────
+# Fully determined by race, so looked up here instead of stored as seven columns per row
+RaceMods = namedtuple("RaceMods", ["hp", "stamina", "aether", "atk", "eatk", "avd", "regen"])
+RACE_MODS = MappingProxyType({
+    "Human":   RaceMods(1.05, 1.05, 1.05, 1.05, 1.05, 1.05, 1.05),
+    "Gorath":  RaceMods(1.25, 1.25, 0.90, 1.20, 0.90, 0.90, 1.00),
+    "Sythari": RaceMods(1.00, 0.90, 1.10, 1.00, 1.15, 1.10, 1.00),
+    "Fenric":  RaceMods(1.10, 1.15, 0.95, 1.15, 0.95, 1.10, 1.00),
+    "Valdren": RaceMods(1.15, 1.10, 1.20, 1.00, 1.00, 1.00, 1.25),
+    "Kaerath": RaceMods(1.00, 1.15, 1.05, 1.10, 1.00, 1.15, 1.10),
+    "Nexari":  RaceMods(1.05, 0.95, 1.15, 1.00, 1.05, 1.05, 1.15),
+    "Ashborn": RaceMods(1.10, 1.05, 1.15, 1.00, 1.15, 0.95, 1.00),
+    "Delvari": RaceMods(1.00, 0.95, 1.10, 1.00, 1.10, 1.05, 1.15),
+    "Verskai": RaceMods(1.05, 1.10, 1.10, 1.10, 1.05, 1.10, 1.00),
+})  # read-only: shared by every request and baked into the SQL CASE expressions
+DEFAULT_RACE_MODS = RACE_MODS["Human"]
+# Still serialized under the old column names so API payloads are unchanged
+RACE_MOD_KEYS = tuple(f"race_{f}_mod" for f in RaceMods._fields)
+
+_character_fields = attrgetter(*CHARACTER_FIELDS)
+_summary_fields = attrgetter(*SUMMARY_FIELDS)
+_stat_fields = attrgetter(*STAT_FIELDS)
+_stat_items = itemgetter(*STAT_FIELDS)  # same six, straight from a loaded instance's __dict__
+
+
+# Argon2id (C reference implementation) — replaces werkzeug's scrypt/pbkdf2 hashes
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+
+try:
+    from gevent import get_hub, monkey as gevent_monkey
+except ImportError:
+    gevent_monkey = None
+
+
+def _sql_int(expr):
+    # Python's int() truncates; all stat formulas are non-negative, so FLOOR matches it
+    return cast(func.floor(expr), Integer)
+
+
+def _sql_race_mod(race_col, field):
+    # RACE_MODS[race].<field> as a CASE, for the hybrid stat expressions
+    return case(
+        {race: getattr(mods, field) for race, mods in RACE_MODS.items()},
+        value=race_col, else_=getattr(DEFAULT_RACE_MODS, field),
+    )
+
+
+def _offload(fn, *args):
+    """
+    Run a CPU-bound hash on gevent's native thread pool when monkey-patched (wsgi.py),
+    so other greenlets keep serving while it runs. Costs one pool thread per in-flight
+    login (hub pool, default 10). Plain call under the threading dev server.
+    """
+    if gevent_monkey is not None and gevent_monkey.is_module_patched("threading"):
+        return get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+
+def _verify_argon2(password_hash, pw):
+    # Mismatch → False rather than raising, so the pool thread doesn't log a traceback
+    try:
+        return password_hasher.verify(password_hash, pw)
+    except (VerificationError, InvalidHashError):
+        return False
 
 
 class Account(db.Model):
     __tablename__ = "accounts"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(db.Uuid, primary_key=True, default=uuid.uuid4)
     username = db.Column(db.String(30), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(256), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
     is_banned = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    last_login = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    last_login = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    # Admin account list is newest-first — walk the index instead of sorting
+    __table_args__ = (db.Index("ix_account_created_desc", created_at.desc()),)
 
-    characters = db.relationship("Character", backref="account", lazy=True, cascade="all, delete-orphan")
+    characters = db.relationship("Character", back_populates="account", lazy=True, cascade="all, delete-orphan")
 
     def set_password(self, pw):
-        self.password_hash = generate_password_hash(pw)
+        self.password_hash = _offload(password_hasher.hash, pw)
 
     def check_password(self, pw):
-        return check_password_hash(self.password_hash, pw)
+        """Verify pw. Legacy werkzeug / outdated argon2 hashes are re-hashed in place on success."""
+        if not self.password_hash.startswith("$argon2"):
+            if not _offload(check_password_hash, self.password_hash, pw):
+                return False
+            self.set_password(pw)
+            return True
+        if not _offload(_verify_argon2, self.password_hash, pw):
+            return False
+        if password_hasher.check_needs_rehash(self.password_hash):
+            self.set_password(pw)
+        return True
 
     def to_dict(self):
         return {
-            "id": self.id, "username": self.username, "email": self.email,
+            "id": str(self.id), "username": self.username, "email": self.email,
             "is_admin": self.is_admin,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "character_count": len(self.characters),
+            "created_at": self.created_at,
+            "character_count": self.character_count,
         }
 
 
 class Character(db.Model):
     __tablename__ = "characters"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    account_id = db.Column(db.String(36), db.ForeignKey("accounts.id"), nullable=False)
+    id = db.Column(db.Uuid, primary_key=True, default=uuid.uuid4)
+    account_id = db.Column(db.Uuid, db.ForeignKey("accounts.id"), nullable=False)
     slot = db.Column(db.Integer, nullable=False)
 
     # ─── IDENTITY ────────────────────────────────────────────
-    name = db.Column(db.String(30), unique=True, nullable=False, index=True)
+    name = db.Column(db.String(30), nullable=False)  # unique case-insensitively, see ix_char_name_lower
     race = db.Column(db.String(30), default="Human")
     city = db.Column(db.String(30), nullable=False)
     allegiance = db.Column(db.String(30), default="None")
@@ -67,12 +178,17 @@ class Character(db.Model):
     agility = db.Column(db.Integer, default=1)
     ether_control = db.Column(db.Integer, default=1)
     mind = db.Column(db.Integer, default=1)
+    # Maintained by Postgres on every write (GENERATED ALWAYS ... STORED). Reads skip the
+    # Python sum; stale until flushed, so derived_stats() recomputes it from the stats.
+    character_level = db.Column(db.Integer, db.Computed(
+        "(strength + vitality + dexterity + agility + ether_control + mind) / 6", persisted=True
+    ))
 
     # ─── DAILY TRAINING (RP-earned, banked TP) ───────────────
     training_points_bank = db.Column(db.Integer, default=0)
     daily_tp_earned = db.Column(db.Integer, default=0)
     daily_rp_sessions = db.Column(db.Integer, default=0)
-    last_reset_date = db.Column(db.String(20), default="")
+    last_reset_date = db.Column(db.Date, nullable=True)  # reset period (see daily_reset)
 
     # ─── CURRENT COMBAT STATE ────────────────────────────────
     current_hp = db.Column(db.Integer, default=-1)
@@ -82,107 +198,197 @@ class Character(db.Model):
     # ─── RPP (Roleplay Points) ───────────────────────────────
     rpp = db.Column(db.Integer, default=0)
     daily_rpp_earned = db.Column(db.Integer, default=0)
-    last_rpp_reset_date = db.Column(db.String(20), default="")
-
-    # ─── RACE MODIFIERS ──────────────────────────────────────
-    race_hp_mod = db.Column(db.Float, default=1.0)
-    race_stamina_mod = db.Column(db.Float, default=1.0)
-    race_aether_mod = db.Column(db.Float, default=1.0)
-    race_atk_mod = db.Column(db.Float, default=1.0)
-    race_eatk_mod = db.Column(db.Float, default=1.0)
-    race_avd_mod = db.Column(db.Float, default=1.0)
-    race_regen_mod = db.Column(db.Float, default=1.0)
+    last_rpp_reset_date = db.Column(db.Date, nullable=True)
 
     # ─── TIMESTAMPS ──────────────────────────────────────────
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
-                           onupdate=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    # onupdate renders now() into the UPDATE itself — Postgres has no column-level ON UPDATE
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # ─── RELATIONSHIPS ───────────────────────────────────────
-    learned_abilities = db.relationship("LearnedAbility", backref="character", lazy=True, cascade="all, delete-orphan")
-    equipment = db.relationship("CharacterEquipment", backref="character", lazy=True, cascade="all, delete-orphan")
-    inventory = db.relationship("CharacterInventory", backref="character", lazy=True, cascade="all, delete-orphan")
-
-    __table_args__ = (db.UniqueConstraint("account_id", "slot", name="uq_account_slot"),)
+    # Reverse (many-to-one) sides are lazy="raise_on_sql": identity-map hits are fine,
+    # but a hot path walking child → parent can't silently emit a SELECT per row
+    account = db.relationship("Account", back_populates="characters", lazy="raise_on_sql")
+    learned_abilities = db.relationship("LearnedAbility", back_populates="character", lazy=True, cascade="all, delete-orphan")
+    equipment = db.relationship("CharacterEquipment", back_populates="character", lazy=True, cascade="all, delete-orphan")
+    inventory = db.relationship("CharacterInventory", back_populates="character", lazy=True, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        db.UniqueConstraint("account_id", "slot", name="uq_account_slot"),
+        # Covers to_summary() so character-select lists can index-only scan
+        db.Index(
+            "ix_char_account_slot_cover", "account_id", "slot",
+            postgresql_include=["id", "name", "race", "city", "rp_rank",
+                                "strength", "vitality", "dexterity", "agility", "ether_control", "mind",
+                                "character_level"],
+        ),
+        # Admin character list is newest-first
+        db.Index("ix_char_created_desc", created_at.desc()),
+        # "Kael" and "kael" are the same name — name checks probe this with lower(name)
+        db.Index("ix_char_name_lower", func.lower(name), unique=True),
+    )
 
     # ═════════════════════════════════════════════════════════
     #  DERIVED STATS — mirrors PlayerData.cs
     # ═════════════════════════════════════════════════════════
 
     @property
-    def character_level(self):
-        return (self.strength + self.vitality + self.dexterity + self.agility + self.ether_control + self.mind) // 6
+    def stat_values(self):
+        """The six training stats in STAT_FIELDS order. Cached until a stat is set or reloaded."""
+        state = self.__dict__
+        stats = state.get("_stats")
+        if stats is None:
+            try:
+                stats = _stat_items(state)
+            except KeyError:  # expired — let the descriptors reload
+                stats = _stat_fields(self)
+            self._stats = stats
+        return stats
 
     @property
+    def race_mods(self):
+        return RACE_MODS.get(self.race, DEFAULT_RACE_MODS)
+
+    def derived_stats(self):
+        """All derived stats in one pass, memoized per instance until a stat or race is set or reloaded."""
+        derived = self.__dict__.get("_derived")
+        if derived is None:
+            derived = self._derived = self._compute_derived_stats()
+        return derived
+
+    def _compute_derived_stats(self):
+        stats = self.stat_values
+        s, v, d, a, e, m = stats
+        mods = self.race_mods
+        lvl = sum(stats) // 6
+        return DerivedStats(
+            character_level=lvl,
+            max_hp=int((200 + v * 15 + m * 8) * mods.hp),
+            max_stamina=int((100 + s * 12 + v * 8) * mods.stamina),
+            max_aether=int((100 + e * 20 + m * 5) * mods.aether),
+            hp_regen=int(m * 0.4),
+            stamina_regen=int(v * 0.3),
+            aether_regen=int(e * 0.8 * mods.regen),
+            atk=int((s * 2.0 + d * 0.5) * mods.atk),
+            eatk=int((e * 2.5 + m * 0.5) * mods.eatk),
+            defense=int(v * 2.0 + s * 0.5),
+            edef=int(m * 1.5 + v * 0.5),
+            avd=int((a * 1.5 + d * 0.5) * mods.avd),
+            acc=int(d * 1.2 + a * 0.3),
+            crit_percent=int(d * 0.3 + a * 0.2),
+            move=min(4 + a // 15, 7),
+            jump=min(2 + s // 20, 5),
+            base_rt=max(80, min(100 - a // 5, 150)),
+            daily_tp_cap=5 if lvl < 10 else 3 if lvl < 20 else 1,
+        )
+
+    # Linear stat formulas double as SQL expressions, so queries can filter/sort on them
+    # server-side, e.g. select(Character.name, Character.atk).order_by(Character.atk.desc())
+    @hybrid_property
     def max_hp(self):
-        return int((200 + self.vitality * 15 + self.mind * 8) * self.race_hp_mod)
+        return self.derived_stats().max_hp
 
-    @property
+    @max_hp.expression
+    def max_hp(cls):
+        return _sql_int((200 + cls.vitality * 15 + cls.mind * 8) * _sql_race_mod(cls.race, "hp"))
+
+    @hybrid_property
     def max_stamina(self):
-        return int((100 + self.strength * 12 + self.vitality * 8) * self.race_stamina_mod)
+        return self.derived_stats().max_stamina
 
-    @property
+    @max_stamina.expression
+    def max_stamina(cls):
+        return _sql_int((100 + cls.strength * 12 + cls.vitality * 8) * _sql_race_mod(cls.race, "stamina"))
+
+    @hybrid_property
     def max_aether(self):
-        return int((100 + self.ether_control * 20 + self.mind * 5) * self.race_aether_mod)
+        return self.derived_stats().max_aether
+
+    @max_aether.expression
+    def max_aether(cls):
+        return _sql_int((100 + cls.ether_control * 20 + cls.mind * 5) * _sql_race_mod(cls.race, "aether"))
 
     @property
     def hp_regen(self):
-        return int(self.mind * 0.4)
+        return self.derived_stats().hp_regen
 
     @property
     def stamina_regen(self):
-        return int(self.vitality * 0.3)
+        return self.derived_stats().stamina_regen
 
     @property
     def aether_regen(self):
-        return int(self.ether_control * 0.8 * self.race_regen_mod)
+        return self.derived_stats().aether_regen
 
-    @property
+    @hybrid_property
     def atk(self):
-        return int((self.strength * 2.0 + self.dexterity * 0.5) * self.race_atk_mod)
+        return self.derived_stats().atk
 
-    @property
+    @atk.expression
+    def atk(cls):
+        return _sql_int((cls.strength * 2.0 + cls.dexterity * 0.5) * _sql_race_mod(cls.race, "atk"))
+
+    @hybrid_property
     def eatk(self):
-        return int((self.ether_control * 2.5 + self.mind * 0.5) * self.race_eatk_mod)
+        return self.derived_stats().eatk
 
-    @property
+    @eatk.expression
+    def eatk(cls):
+        return _sql_int((cls.ether_control * 2.5 + cls.mind * 0.5) * _sql_race_mod(cls.race, "eatk"))
+
+    @hybrid_property
     def defense(self):
-        return int(self.vitality * 2.0 + self.strength * 0.5)
+        return self.derived_stats().defense
 
-    @property
+    @defense.expression
+    def defense(cls):
+        return _sql_int(cls.vitality * 2.0 + cls.strength * 0.5)
+
+    @hybrid_property
     def edef(self):
-        return int(self.mind * 1.5 + self.vitality * 0.5)
+        return self.derived_stats().edef
 
-    @property
+    @edef.expression
+    def edef(cls):
+        return _sql_int(cls.mind * 1.5 + cls.vitality * 0.5)
+
+    @hybrid_property
     def avd(self):
-        return int((self.agility * 1.5 + self.dexterity * 0.5) * self.race_avd_mod)
+        return self.derived_stats().avd
 
-    @property
+    @avd.expression
+    def avd(cls):
+        return _sql_int((cls.agility * 1.5 + cls.dexterity * 0.5) * _sql_race_mod(cls.race, "avd"))
+
+    @hybrid_property
     def acc(self):
-        return int(self.dexterity * 1.2 + self.agility * 0.3)
+        return self.derived_stats().acc
+
+    @acc.expression
+    def acc(cls):
+        return _sql_int(cls.dexterity * 1.2 + cls.agility * 0.3)
 
     @property
     def crit_percent(self):
-        return int(self.dexterity * 0.3 + self.agility * 0.2)
+        return self.derived_stats().crit_percent
 
     @property
     def move(self):
-        return min(4 + self.agility // 15, 7)
+        return self.derived_stats().move
 
     @property
     def jump(self):
-        return min(2 + self.strength // 20, 5)
+        return self.derived_stats().jump
 
     @property
     def base_rt(self):
-        return max(80, min(100 - self.agility // 5, 150))
+        return self.derived_stats().base_rt
 
     @property
     def daily_tp_cap(self):
-        lvl = self.character_level
-        if lvl < 10: return 5
-        elif lvl < 20: return 3
-        else: return 1
+        # From the live stats, like every other derived value — the stored character_level
+        # column is stale after a stat change until flush, and None before the first INSERT
+        return self.derived_stats().daily_tp_cap
 
     @property
     def daily_tp_remaining(self):
@@ -190,14 +396,33 @@ class Character(db.Model):
 
     # ─── ABILITY HELPERS ─────────────────────────────────────
 
-    def get_learned_skill_ids(self):
-        return [a.ability_id for a in self.learned_abilities if a.ability_type == "skill"]
-
-    def get_learned_spell_ids(self):
-        return [a.ability_id for a in self.learned_abilities if a.ability_type == "spell"]
+    def get_learned_ability_ids(self):
+        """(skill_ids, spell_ids) in a single pass over learned_abilities."""
+        skills, spells = [], []
+        add_skill, add_spell = skills.append, spells.append
+        for a in self.learned_abilities:
+            if a.ability_type == "skill":
+                add_skill(a.ability_id)
+            elif a.ability_type == "spell":
+                add_spell(a.ability_id)
+        return skills, spells
 
     def has_ability(self, ability_id, ability_type):
-        return any(a.ability_id == ability_id and a.ability_type == ability_type for a in self.learned_abilities)
+        """
+        Collection already loaded → O(1) set of (type, id), built once and dropped when the
+        collection changes. Otherwise one EXISTS probe on uq_char_ability — the learn route
+        only needs a yes/no, not every learned row.
+        """
+        if "learned_abilities" not in self.__dict__:
+            return db.session.scalar(select(exists().where(
+                LearnedAbility.character_id == self.id,
+                LearnedAbility.ability_type == ability_type,
+                LearnedAbility.ability_id == ability_id,
+            )))
+        index = self.__dict__.get("_ability_index")
+        if index is None:
+            index = self._ability_index = {(a.ability_type, a.ability_id) for a in self.learned_abilities}
+        return (ability_type, ability_id) in index
 
     def get_equipped_items(self):
         return {e.slot: e.to_dict() for e in self.equipment}
@@ -209,56 +434,67 @@ class Character(db.Model):
     #  SERIALIZATION
     # ═════════════════════════════════════════════════════════
 
+    def _plain_fields(self, fields, getter):
+        """Loaded columns straight from __dict__ (no descriptor per field); the getter reloads if any expired."""
+        state = self.__dict__
+        try:
+            return {k: state[k] for k in fields}
+        except KeyError:
+            return dict(zip(fields, getter(self)))
+
     def to_dict(self):
-        return {
-            "id": self.id, "account_id": self.account_id, "slot": self.slot,
-            "name": self.name, "race": self.race, "city": self.city,
-            "allegiance": self.allegiance, "rp_rank": self.rp_rank,
-            "bio": self.bio, "play_by_path": self.play_by_path,
-            "strength": self.strength, "vitality": self.vitality,
-            "dexterity": self.dexterity, "agility": self.agility,
-            "ether_control": self.ether_control, "mind": self.mind,
-            "training_points_bank": self.training_points_bank,
-            "daily_tp_earned": self.daily_tp_earned,
-            "daily_rp_sessions": self.daily_rp_sessions,
-            "last_reset_date": self.last_reset_date,
-            "daily_tp_cap": self.daily_tp_cap,
-            "daily_tp_remaining": self.daily_tp_remaining,
-            "current_hp": self.current_hp,
-            "current_stamina": self.current_stamina,
-            "current_aether": self.current_aether,
-            "rpp": self.rpp, "daily_rpp_earned": self.daily_rpp_earned,
-            "race_hp_mod": self.race_hp_mod, "race_stamina_mod": self.race_stamina_mod,
-            "race_aether_mod": self.race_aether_mod, "race_atk_mod": self.race_atk_mod,
-            "race_eatk_mod": self.race_eatk_mod, "race_avd_mod": self.race_avd_mod,
-            "race_regen_mod": self.race_regen_mod,
-            "character_level": self.character_level,
-            "max_hp": self.max_hp, "max_stamina": self.max_stamina,
-            "max_aether": self.max_aether,
-            "hp_regen": self.hp_regen, "stamina_regen": self.stamina_regen,
-            "aether_regen": self.aether_regen,
-            "atk": self.atk, "defense": self.defense,
-            "eatk": self.eatk, "edef": self.edef,
-            "avd": self.avd, "acc": self.acc,
-            "crit_percent": self.crit_percent,
-            "move": self.move, "jump": self.jump, "base_rt": self.base_rt,
-            "learned_skills": self.get_learned_skill_ids(),
-            "learned_spells": self.get_learned_spell_ids(),
-            "equipment": self.get_equipped_items(),
-            "inventory": self.get_inventory_list(),
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
+        data = self._plain_fields(CHARACTER_FIELDS, _character_fields)
+        d = self.derived_stats()
+        data.update(d._asdict())
+        data.update(zip(RACE_MOD_KEYS, self.race_mods))
+        data["id"] = str(self.id)
+        data["account_id"] = str(self.account_id)
+        data["daily_tp_remaining"] = max(0, d.daily_tp_cap - self.daily_tp_earned)
+        data["learned_skills"], data["learned_spells"] = self.get_learned_ability_ids()
+        data["equipment"] = self.get_equipped_items()
+        data["inventory"] = self.get_inventory_list()
+        return data
+
+    @classmethod
+    def summary_rows(cls, *criteria, order_by=None):
+        """to_summary() dicts straight from a column SELECT — no ORM instances, and the
+        covering index lets Postgres answer account lookups with an index-only scan."""
+        stmt = select(*[getattr(cls, f) for f in SUMMARY_FIELDS], cls.id, cls.character_level).where(*criteria)
+        if order_by is not None:
+            stmt = stmt.order_by(order_by)
+        return [row._asdict() for row in db.session.execute(stmt)]
 
     def to_summary(self):
-        return {
-            "id": self.id, "slot": self.slot, "name": self.name,
-            "race": self.race, "city": self.city, "rp_rank": self.rp_rank,
-            "character_level": self.character_level,
-            "strength": self.strength, "vitality": self.vitality,
-            "dexterity": self.dexterity, "agility": self.agility,
-            "ether_control": self.ether_control, "mind": self.mind,
-        }
+        data = self._plain_fields(SUMMARY_FIELDS, _summary_fields)
+        data["id"] = str(self.id)
+        data["character_level"] = self.character_level
+        return data
+
+
+def _drop_cached_stats(target, *args):
+    target.__dict__.pop("_stats", None)
+    target.__dict__.pop("_derived", None)
+
+
+def _drop_ability_index(target, *args):
+    target.__dict__.pop("_ability_index", None)
+
+
+for _stat in STAT_FIELDS + ("race",):
+    event.listen(getattr(Character, _stat), "set", _drop_cached_stats)
+for _evt in ("append", "remove", "set"):
+    event.listen(Character.learned_abilities, _evt, _drop_ability_index)
+for _evt in ("expire", "refresh"):
+    event.listen(Character, _evt, _drop_cached_stats)
+    event.listen(Character, _evt, _drop_ability_index)
+
+# Scalar COUNT subquery instead of len(self.characters) — no Character rows materialized.
+# Deferred: loads on first access, or inline with undefer(Account.character_count).
+Account.character_count = column_property(
+    select(func.count(Character.id)).where(Character.account_id == Account.id)
+    .correlate_except(Character).scalar_subquery(),
+    deferred=True,
+)
 
 
 # ═════════════════════════════════════════════════════════════
@@ -269,13 +505,17 @@ class LearnedAbility(db.Model):
     __tablename__ = "learned_abilities"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    character_id = db.Column(db.String(36), db.ForeignKey("characters.id"), nullable=False, index=True)
+    # No separate index: uq_char_ability (character_id, ability_type, ability_id) already
+    # serves lookups by character_id and by (character_id, ability_type)
+    character_id = db.Column(db.Uuid, db.ForeignKey("characters.id"), nullable=False)
     ability_type = db.Column(db.String(10), nullable=False)  # 'skill' or 'spell'
     ability_id = db.Column(db.String(60), nullable=False)
     tier = db.Column(db.Integer, default=1)
     tree_or_element = db.Column(db.String(30), default="")  # e.g. "Vanguard" or "Fire"
     rpp_spent = db.Column(db.Integer, default=0)
-    learned_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    learned_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+
+    character = db.relationship("Character", back_populates="learned_abilities", lazy="raise_on_sql")
 
     __table_args__ = (db.UniqueConstraint("character_id", "ability_type", "ability_id", name="uq_char_ability"),)
 
@@ -284,7 +524,7 @@ class LearnedAbility(db.Model):
             "ability_type": self.ability_type, "ability_id": self.ability_id,
             "tier": self.tier, "tree_or_element": self.tree_or_element,
             "rpp_spent": self.rpp_spent,
-            "learned_at": self.learned_at.isoformat() if self.learned_at else None,
+            "learned_at": self.learned_at,
         }
 
 
@@ -325,6 +565,8 @@ class ItemDefinition(db.Model):
     craftable = db.Column(db.Boolean, default=False)
     craft_profession = db.Column(db.String(20), default="")
     craft_level = db.Column(db.Integer, default=0)
+    # Bumped on every ORM update — with the row count it versions the per-process item cache
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     def to_dict(self):
         return {
@@ -347,6 +589,98 @@ class ItemDefinition(db.Model):
         }
 
 
+# item_id → ItemDefinition.to_dict(). Items are reference data (edited by admins /
+# import-items only), so equipment and inventory rows serialize from here instead of
+# joining item_definitions into every row.
+_item_dicts = {}
+# The same dicts ordered by (tier, name) — the unfiltered /equipment/catalog listing
+_item_catalog = []
+# ...and that listing already encoded as the /equipment/catalog response body
+_item_catalog_json = None
+
+# Other processes (import-items, another worker's admin edit) can't clear this cache, so
+# every ITEM_CACHE_CHECK_SECONDS one aggregate compares (count, newest updated_at) with
+# the version the cache was loaded at and drops it on a mismatch.
+ITEM_CACHE_CHECK_SECONDS = 30
+_item_cache_version = None
+_item_cache_checked_at = 0.0
+
+
+def _item_table_version():
+    return tuple(db.session.execute(
+        select(func.count(ItemDefinition.id), func.max(ItemDefinition.updated_at))
+    ).one())
+
+
+def _check_item_cache():
+    """Drop the cache if item_definitions changed elsewhere — at most one probe per interval."""
+    global _item_cache_checked_at
+    if _item_cache_version is None:
+        return  # nothing loaded yet
+    now = time.monotonic()
+    if now - _item_cache_checked_at < ITEM_CACHE_CHECK_SECONDS:
+        return
+    _item_cache_checked_at = now
+    if _item_table_version() != _item_cache_version:
+        clear_item_cache()
+
+
+def _load_item_cache():
+    global _item_cache_version, _item_cache_checked_at
+    # Version first: a change landing mid-load then shows up as a mismatch on the next check
+    _item_cache_version = _item_table_version()
+    _item_cache_checked_at = time.monotonic()
+    items = ItemDefinition.query.order_by(ItemDefinition.tier, ItemDefinition.name).all()
+    _item_catalog[:] = [i.to_dict() for i in items]
+    _item_dicts.update((d["id"], d) for d in _item_catalog)
+
+
+def item_catalog():
+    """Every item definition, serialized once per process and shared by every request."""
+    _check_item_cache()
+    if not _item_catalog:
+        _load_item_cache()
+    return _item_catalog
+
+
+def item_catalog_json():
+    """{"items": item_catalog()} as JSON bytes, encoded once per cache load."""
+    global _item_catalog_json
+    _check_item_cache()
+    if _item_catalog_json is None:
+        _item_catalog_json = orjson.dumps({"items": item_catalog()}, option=ORJSON_OPTIONS)
+    return _item_catalog_json
+
+
+def item_definition_dict(item_id):
+    """Serialized item definition from the process cache. First use loads the whole
+    catalog in one SELECT; later misses (an item added by another process) fetch just that row."""
+    _check_item_cache()
+    data = _item_dicts.get(item_id)
+    if data is None:
+        if not _item_dicts:
+            _load_item_cache()
+            data = _item_dicts.get(item_id)
+        if data is None:
+            item = db.session.get(ItemDefinition, item_id)
+            if item is None:
+                return None
+            data = _item_dicts[item_id] = item.to_dict()
+    return data
+
+
+def clear_item_cache(*args):
+    global _item_catalog_json, _item_cache_version
+    _item_dicts.clear()
+    _item_catalog.clear()
+    _item_catalog_json = None
+    _item_cache_version = None
+
+
+for _evt in ("after_insert", "after_update", "after_delete"):
+    event.listen(ItemDefinition, _evt, clear_item_cache)
+
+
 # ═════════════════════════════════════════════════════════════
 #  CHARACTER EQUIPMENT — equipped gear
 # ═════════════════════════════════════════════════════════════
@@ -355,20 +689,23 @@ class CharacterEquipment(db.Model):
     __tablename__ = "character_equipment"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    character_id = db.Column(db.String(36), db.ForeignKey("characters.id"), nullable=False, index=True)
+    character_id = db.Column(db.Uuid, db.ForeignKey("characters.id"), nullable=False, index=True)
     slot = db.Column(db.String(20), nullable=False)
     item_id = db.Column(db.String(60), db.ForeignKey("item_definitions.id"), nullable=False)
-    equipped_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    equipped_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    item = db.relationship("ItemDefinition", lazy="joined")
+    character = db.relationship("Character", back_populates="equipment", lazy="raise_on_sql")
+    item = db.relationship("ItemDefinition", lazy="raise")  # serialize via item_definition_dict()
 
     __table_args__ = (db.UniqueConstraint("character_id", "slot", name="uq_char_slot"),)
+    # Swaps UPDATE the slot's row; fetch the restamped equipped_at with RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
     def to_dict(self):
         return {
             "slot": self.slot, "item_id": self.item_id,
-            "item": self.item.to_dict() if self.item else None,
-            "equipped_at": self.equipped_at.isoformat() if self.equipped_at else None,
+            "item": item_definition_dict(self.item_id),
+            "equipped_at": self.equipped_at,
         }
 
 
@@ -380,17 +717,34 @@ class CharacterInventory(db.Model):
     __tablename__ = "character_inventory"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    character_id = db.Column(db.String(36), db.ForeignKey("characters.id"), nullable=False, index=True)
+    character_id = db.Column(db.Uuid, db.ForeignKey("characters.id"), nullable=False, index=True)
     item_id = db.Column(db.String(60), db.ForeignKey("item_definitions.id"), nullable=False)
     quantity = db.Column(db.Integer, default=1)
-    obtained_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    obtained_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
 
-    item = db.relationship("ItemDefinition", lazy="joined")
+    character = db.relationship("Character", back_populates="inventory", lazy="raise_on_sql")
+    item = db.relationship("ItemDefinition", lazy="raise")  # serialize via item_definition_dict()
 
     __table_args__ = (db.UniqueConstraint("character_id", "item_id", name="uq_char_item"),)
 
     def to_dict(self):
         return {
             "item_id": self.item_id, "quantity": self.quantity,
-            "item": self.item.to_dict() if self.item else None,
+            "item": item_definition_dict(self.item_id),
         }
+
+
+# ═════════════════════════════════════════════════════════════
+#  LOADER OPTIONS
+# ═════════════════════════════════════════════════════════════
+
+# Loader options for queries that to_dict() several characters — one IN (...) SELECT per
+# collection for the whole batch instead of three lazy loads per character.
+# raiseload("*") turns any other relationship touched on these rows into an error
+# instead of a silent per-row lazy SELECT.
+CHARACTER_DETAIL_OPTIONS = (
+    selectinload(Character.learned_abilities),
+    selectinload(Character.equipment),
+    selectinload(Character.inventory),
+    raiseload("*"),
+)
@@ -4,12 +4,14 @@ RPP costs: T1=3, T2=8, T3=15, T4=25 (same for skills & spells)
 Prereqs: 3×T1→T2, 2×T2→T3, 1×T3→T4 (per tree/element)
 Daily RPP cap: 8/day, resets at 12:00 PM EST (17:00 UTC)
 """
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, current_app, request, jsonify, g
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.orm import raiseload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from database import db
 from models import Character, LearnedAbility
-from routes.auth import require_auth
-from daily_reset import get_current_reset_period
+from routes.auth import not_modified, private_cache, require_auth
 
 abilities_bp = Blueprint("abilities", __name__)
 
@@ -17,6 +19,10 @@ abilities_bp = Blueprint("abilities", __name__)
 RPP_COST = {1: 3, 2: 8, 3: 15, 4: 25}
 DAILY_RPP_CAP = 8
 
+# /rpp-status body — fixed shape of ints, so fill a template instead of encoding a dict
+RPP_STATUS_JSON = ('{"rpp":%%d,"daily_rpp_earned":%%d,"daily_rpp_cap":%d,"remaining_today":%%d}'
+                   % DAILY_RPP_CAP)
+
 # ─── TIER GATE: how many of previous tier needed ────────────
 TIER_GATE = {2: 3, 3: 2, 4: 1}  # T1=free
 
@@ -25,7 +31,7 @@ TIER_GATE = {2: 3, 3: 2, 4: 1}  # T1=free
 #  LEARN SKILL
 # ═══════════════════════════════════════════════════════════
 
-@abilities_bp.route("/<character_id>/learn-skill", methods=["POST"])
+@abilities_bp.route("/<uuid:character_id>/learn-skill", methods=["POST"])
 @require_auth
 def learn_skill(character_id):
     """
@@ -35,150 +41,63 @@ def learn_skill(character_id):
     - Tier gate met (3×T1→T2, 2×T2→T3, 1×T3→T4)
     - Sufficient RPP
     """
-    char = Character.query.filter_by(id=character_id, account_id=g.current_account.id).first()
-    if not char:
-        return jsonify({"error": "Character not found."}), 404
-
-    data = request.get_json()
-    ability_id = data.get("ability_id", "").strip()
-    tier = data.get("tier", 1)
-    tree = data.get("tree", "").strip()
-
-    if not ability_id:
-        return jsonify({"error": "ability_id required."}), 400
-    if tier not in RPP_COST:
-        return jsonify({"error": f"Invalid tier: {tier}"}), 400
-
-    # Already learned?
-    if char.has_ability(ability_id, "skill"):
-        return jsonify({"error": "Skill already learned."}), 409
-
-    # Tier gate check
-    if tier > 1:
-        prev_tier = tier - 1
-        needed = TIER_GATE.get(tier, 0)
-        owned_prev = sum(
-            1 for a in char.learned_abilities
-            if a.ability_type == "skill" and a.tree_or_element == tree and a.tier == prev_tier
-        )
-        if owned_prev < needed:
-            return jsonify({
-                "error": f"Need {needed}× Tier {prev_tier} {tree} skills (have {owned_prev}).",
-                "needed": needed, "have": owned_prev,
-            }), 400
-
-    # RPP check
-    cost = RPP_COST[tier]
-    if char.rpp < cost:
-        return jsonify({
-            "error": f"Need {cost} RPP (have {char.rpp}).",
-            "cost": cost, "rpp": char.rpp,
-        }), 400
-
-    # Learn it
-    char.rpp -= cost
-    ability = LearnedAbility(
-        character_id=char.id, ability_type="skill",
-        ability_id=ability_id, tier=tier,
-        tree_or_element=tree, rpp_spent=cost,
-    )
-    db.session.add(ability)
-    db.session.commit()
-
-    return jsonify({
-        "message": f"Learned {ability_id} (-{cost} RPP)",
-        "rpp": char.rpp,
-        "learned_skills": char.get_learned_skill_ids(),
-    }), 200
+    return _learn_ability(character_id, "skill", "tree")
 
 
 # ═══════════════════════════════════════════════════════════
 #  LEARN SPELL
 # ═══════════════════════════════════════════════════════════
 
-@abilities_bp.route("/<character_id>/learn-spell", methods=["POST"])
+@abilities_bp.route("/<uuid:character_id>/learn-spell", methods=["POST"])
 @require_auth
 def learn_spell(character_id):
     """Learn a spell. Same validation as skills but for spells/elements."""
-    char = Character.query.filter_by(id=character_id, account_id=g.current_account.id).first()
-    if not char:
-        return jsonify({"error": "Character not found."}), 404
-
-    data = request.get_json()
-    ability_id = data.get("ability_id", "").strip()
-    tier = data.get("tier", 1)
-    element = data.get("element", "").strip()
-
-    if not ability_id:
-        return jsonify({"error": "ability_id required."}), 400
-    if tier not in RPP_COST:
-        return jsonify({"error": f"Invalid tier: {tier}"}), 400
-
-    if char.has_ability(ability_id, "spell"):
-        return jsonify({"error": "Spell already learned."}), 409
-
-    # Tier gate
-    if tier > 1:
-        prev_tier = tier - 1
-        needed = TIER_GATE.get(tier, 0)
-        owned_prev = sum(
-            1 for a in char.learned_abilities
-            if a.ability_type == "spell" and a.tree_or_element == element and a.tier == prev_tier
-        )
-        if owned_prev < needed:
-            return jsonify({
-                "error": f"Need {needed}× Tier {prev_tier} {element} spells (have {owned_prev}).",
-                "needed": needed, "have": owned_prev,
-            }), 400
-
-    cost = RPP_COST[tier]
-    if char.rpp < cost:
-        return jsonify({
-            "error": f"Need {cost} RPP (have {char.rpp}).",
-            "cost": cost, "rpp": char.rpp,
-        }), 400
-
-    char.rpp -= cost
-    ability = LearnedAbility(
-        character_id=char.id, ability_type="spell",
-        ability_id=ability_id, tier=tier,
-        tree_or_element=element, rpp_spent=cost,
-    )
-    db.session.add(ability)
-    db.session.commit()
-
-    return jsonify({
-        "message": f"Learned {ability_id} (-{cost} RPP)",
-        "rpp": char.rpp,
-        "learned_spells": char.get_learned_spell_ids(),
-    }), 200
+    return _learn_ability(character_id, "spell", "element")
 
 
 # ═══════════════════════════════════════════════════════════
 #  GET LEARNED ABILITIES
 # ═══════════════════════════════════════════════════════════
 
-@abilities_bp.route("/<character_id>/abilities", methods=["GET"])
+@abilities_bp.route("/<uuid:character_id>/abilities", methods=["GET"])
 @require_auth
+@private_cache()
 def get_abilities(character_id):
     """Return all learned skills and spells for a character."""
-    char = Character.query.filter_by(id=character_id, account_id=g.current_account.id).first()
+    # Anything touched lazily raises instead of querying; the collection is filled below
+    char = _owned_character(character_id, raiseload("*"))
     if not char:
         return jsonify({"error": "Character not found."}), 404
 
-    return jsonify({
-        "learned_skills": char.get_learned_skill_ids(),
-        "learned_spells": char.get_learned_spell_ids(),
+    # Learned abilities are insert-only, so (count, newest id) + rpp versions the body —
+    # one aggregate on uq_char_ability answers an unchanged poll without loading any rows
+    learned_count, newest_id = db.session.execute(
+        select(func.count(LearnedAbility.id), func.max(LearnedAbility.id))
+        .where(LearnedAbility.character_id == char.id)
+    ).one()
+    etag = f"{char.id}-{char.rpp}-{learned_count}-{newest_id}"
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    set_committed_value(char, "learned_abilities", db.session.scalars(
+        select(LearnedAbility).where(LearnedAbility.character_id == char.id).order_by(LearnedAbility.id)
+    ).all())
+    skills, spells = char.get_learned_ability_ids()
+    response = jsonify({
+        "learned_skills": skills,
+        "learned_spells": spells,
         "abilities": [a.to_dict() for a in char.learned_abilities],
         "rpp": char.rpp,
-    }), 200
+    })
+    response.set_etag(etag)
+    return response
 
 
 # ═══════════════════════════════════════════════════════════
 #  RPP EARNING — called by chat/RP system
 # ═══════════════════════════════════════════════════════════
 
-@abilities_bp.route("/<character_id>/earn-rpp", methods=["POST"])
+@abilities_bp.route("/<uuid:character_id>/earn-rpp", methods=["POST"])
 @require_auth
 def earn_rpp(character_id):
     """
@@ -187,16 +106,6 @@ def earn_rpp(character_id):
 
     Expected JSON: {"amount": 1-3, "reason": "rp_session"}
     """
-    char = Character.query.filter_by(id=character_id, account_id=g.current_account.id).first()
-    if not char:
-        return jsonify({"error": "Character not found."}), 404
-
-    # Check/reset daily RPP counter
-    current_period = get_current_reset_period()
-    if char.last_rpp_reset_date != current_period:
-        char.daily_rpp_earned = 0
-        char.last_rpp_reset_date = current_period
-
     data = request.get_json()
     amount = data.get("amount", 1)
     reason = data.get("reason", "rp_session")
@@ -204,28 +113,27 @@ def earn_rpp(character_id):
     if not isinstance(amount, int) or amount < 1:
         return jsonify({"error": "Amount must be a positive integer."}), 400
 
-    # Enforce daily cap
-    remaining = DAILY_RPP_CAP - char.daily_rpp_earned
-    if remaining <= 0:
+    # Period reset + daily cap applied in SQL — no read-modify-write on the usual path
+    result = _award_rpp(character_id, amount, g.current_reset_period)
+    if result is None:
+        return jsonify({"error": "Character not found."}), 404
+    awarded, rpp, daily_rpp_earned = result
+
+    if awarded <= 0:
         return jsonify({
             "message": "Daily RPP cap reached.",
-            "rpp_awarded": 0, "rpp": char.rpp,
-            "daily_rpp_earned": char.daily_rpp_earned,
+            "rpp_awarded": 0, "rpp": rpp,
+            "daily_rpp_earned": daily_rpp_earned,
             "daily_rpp_cap": DAILY_RPP_CAP,
             "at_cap": True,
         }), 200
 
-    awarded = min(amount, remaining)
-    char.rpp += awarded
-    char.daily_rpp_earned += awarded
-    db.session.commit()
-
     return jsonify({
         "message": f"+{awarded} RPP ({reason})",
-        "rpp_awarded": awarded, "rpp": char.rpp,
-        "daily_rpp_earned": char.daily_rpp_earned,
+        "rpp_awarded": awarded, "rpp": rpp,
+        "daily_rpp_earned": daily_rpp_earned,
         "daily_rpp_cap": DAILY_RPP_CAP,
-        "at_cap": char.daily_rpp_earned >= DAILY_RPP_CAP,
+        "at_cap": daily_rpp_earned >= DAILY_RPP_CAP,
     }), 200
 
 
@@ -233,24 +141,181 @@ def earn_rpp(character_id):
 #  RPP STATUS (read-only)
 # ═══════════════════════════════════════════════════════════
 
-@abilities_bp.route("/<character_id>/rpp-status", methods=["GET"])
+@abilities_bp.route("/<uuid:character_id>/rpp-status", methods=["GET"])
 @require_auth
+@private_cache()
 def rpp_status(character_id):
     """Current RPP balance and daily earning status."""
-    char = Character.query.filter_by(id=character_id, account_id=g.current_account.id).first()
+    char = _owned_character(character_id)
     if not char:
         return jsonify({"error": "Character not found."}), 404
 
     # Check/reset
-    current_period = get_current_reset_period()
+    current_period = g.current_reset_period
     if char.last_rpp_reset_date != current_period:
         char.daily_rpp_earned = 0
         char.last_rpp_reset_date = current_period
         db.session.commit()
 
+    # The body is just these counters — answer an unchanged poll before formatting it
+    etag = f"{char.id}-{current_period}-{char.rpp}-{char.daily_rpp_earned}"
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    body = RPP_STATUS_JSON % (char.rpp, char.daily_rpp_earned, max(0, DAILY_RPP_CAP - char.daily_rpp_earned))
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+
+# ═══════════════════════════════════════════════════════════
+#  HELPERS
+# ═══════════════════════════════════════════════════════════
+
+def _owned_character(character_id, *options):
+    """The caller's character by primary key (identity-map hit if already loaded), else None."""
+    char = db.session.get(Character, character_id, options=options)
+    if char is None or char.account_id != g.current_account.id:
+        return None
+    return char
+
+
+def _learn_ability(character_id, ability_type, group_key):
+    """
+    Shared body of learn-skill / learn-spell. group_key is the request field naming the
+    tree ("tree") or element ("element"); both are stored in tree_or_element.
+    """
+    # raiseload: every check below is its own small query, nothing walks a collection
+    char = _owned_character(character_id, raiseload("*"))
+    if not char:
+        return jsonify({"error": "Character not found."}), 404
+
+    data = request.get_json()
+    ability_id = data.get("ability_id", "").strip()
+    tier = data.get("tier", 1)
+    group = data.get(group_key, "").strip()
+
+    if not ability_id:
+        return jsonify({"error": "ability_id required."}), 400
+    if tier not in RPP_COST:
+        return jsonify({"error": f"Invalid tier: {tier}"}), 400
+
+    # Already learned?
+    if char.has_ability(ability_id, ability_type):
+        return jsonify({"error": f"{ability_type.capitalize()} already learned."}), 409
+
+    # Tier gate check
+    if tier > 1:
+        prev_tier = tier - 1
+        needed = TIER_GATE.get(tier, 0)
+        owned_prev = _count_learned(char.id, ability_type, group, prev_tier)
+        if owned_prev < needed:
+            return jsonify({
+                "error": f"Need {needed}× Tier {prev_tier} {group} {ability_type}s (have {owned_prev}).",
+                "needed": needed, "have": owned_prev,
+            }), 400
+
+    # RPP check
+    cost = RPP_COST[tier]
+    if char.rpp < cost:
+        return jsonify({
+            "error": f"Need {cost} RPP (have {char.rpp}).",
+            "cost": cost, "rpp": char.rpp,
+        }), 400
+
+    # Learn it
+    rpp = _spend_and_learn(char.id, ability_type, ability_id, tier, group, cost)
+    if rpp is None:
+        return jsonify({"error": f"Need {cost} RPP.", "cost": cost}), 400
+
+    # char is expired by the commit — use the route's id rather than refreshing it
     return jsonify({
-        "rpp": char.rpp,
-        "daily_rpp_earned": char.daily_rpp_earned,
-        "daily_rpp_cap": DAILY_RPP_CAP,
-        "remaining_today": max(0, DAILY_RPP_CAP - char.daily_rpp_earned),
+        "message": f"Learned {ability_id} (-{cost} RPP)",
+        "rpp": rpp,
+        f"learned_{ability_type}s": _learned_ids(character_id, ability_type),
     }), 200
+
+
+def _count_learned(character_id, ability_type, tree_or_element, tier):
+    """Owned abilities of one tree/element + tier — the DB returns a single integer.
+    uq_char_ability's (character_id, ability_type) prefix narrows the scan to this character."""
+    return db.session.scalar(
+        select(func.count(LearnedAbility.id)).where(
+            LearnedAbility.character_id == character_id,
+            LearnedAbility.ability_type == ability_type,
+            LearnedAbility.tree_or_element == tree_or_element,
+            LearnedAbility.tier == tier,
+        )
+    )
+
+
+def _learned_ids(character_id, ability_type):
+    """ability_ids of one type, oldest first — a single-column read, no LearnedAbility rows."""
+    return list(db.session.scalars(
+        select(LearnedAbility.ability_id)
+        .where(LearnedAbility.character_id == character_id, LearnedAbility.ability_type == ability_type)
+        .order_by(LearnedAbility.id)
+    ))
+
+
+def _spend_and_learn(character_id, ability_type, ability_id, tier, tree_or_element, cost):
+    """
+    Deduct RPP and record the ability in one transaction — a guarded UPDATE ... RETURNING
+    plus an INSERT, no ORM flush. The WHERE rpp >= cost makes a concurrent double-spend
+    fail instead of going negative. Returns the new RPP balance, or None if it couldn't pay.
+    """
+    rpp = db.session.execute(
+        update(Character)
+        .where(Character.id == character_id, Character.rpp >= cost)
+        .values(rpp=Character.rpp - cost)
+        .returning(Character.rpp)
+    ).scalar_one_or_none()
+    if rpp is None:
+        db.session.rollback()
+        return None
+
+    db.session.execute(insert(LearnedAbility).values(
+        character_id=character_id, ability_type=ability_type,
+        ability_id=ability_id, tier=tier,
+        tree_or_element=tree_or_element, rpp_spent=cost,
+    ))
+    db.session.commit()
+    return rpp
+
+
+def _award_rpp(character_id, amount, current_period):
+    """
+    Award RPP under the daily cap. Returns (awarded, rpp, daily_rpp_earned), or None if
+    the caller doesn't own the character.
+
+    Usual case — the whole amount fits under today's cap — is one guarded UPDATE ...
+    RETURNING that also applies the period reset, so concurrent awards can't overshoot.
+    Only a capped/partial award (or a miss) falls back to a locked read-modify-write.
+    """
+    earned = case((Character.last_rpp_reset_date.is_distinct_from(current_period), 0),
+                  else_=Character.daily_rpp_earned)
+    row = db.session.execute(
+        update(Character)
+        .where(Character.id == character_id, Character.account_id == g.current_account.id,
+               earned + amount <= DAILY_RPP_CAP)
+        .values(rpp=Character.rpp + amount, daily_rpp_earned=earned + amount,
+                last_rpp_reset_date=current_period)
+        .returning(Character.rpp, Character.daily_rpp_earned)
+    ).one_or_none()
+    if row is not None:
+        db.session.commit()
+        return amount, row.rpp, row.daily_rpp_earned
+
+    char = db.session.get(Character, character_id, with_for_update=True)
+    if char is None or char.account_id != g.current_account.id:
+        db.session.rollback()
+        return None
+    if char.last_rpp_reset_date != current_period:
+        char.daily_rpp_earned = 0
+        char.last_rpp_reset_date = current_period
+    awarded = max(0, min(amount, DAILY_RPP_CAP - char.daily_rpp_earned))
+    char.rpp += awarded
+    char.daily_rpp_earned += awarded
+    result = awarded, char.rpp, char.daily_rpp_earned  # read before commit expires them
+    db.session.commit()
+    return result
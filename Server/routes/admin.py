@@ -4,6 +4,8 @@ All routes require admin privileges.
 """
 from flask import Blueprint, request, jsonify, g
 from datetime import datetime, timezone
+from sqlalchemy import update
+from sqlalchemy.orm import raiseload, undefer
 
 from database import db
 from models import Account, Character
@@ -11,15 +13,24 @@ from routes.auth import require_admin
 
 admin_bp = Blueprint("admin", __name__)
 
-VALID_RANKS = ["Aspirant", "Sworn", "Warden", "Banneret", "Justicar"]
-VALID_STATS = ["strength", "vitality", "agility", "dexterity", "mind", "ether_control"]
+# Ordered tuple for the error message; frozensets for the per-request membership checks
+RANK_ORDER = ("Aspirant", "Sworn", "Warden", "Banneret", "Justicar")
+VALID_RANKS = frozenset(RANK_ORDER)
+INVALID_RANK_ERROR = f"Invalid rank. Must be one of: {', '.join(RANK_ORDER)}"
+VALID_STATS = frozenset(("strength", "vitality", "agility", "dexterity", "mind", "ether_control"))
+
+# Columns cleared by reset-training / reset-training-all
+TRAINING_RESET = {"daily_tp_earned": 0, "daily_rp_sessions": 0, "last_reset_date": None}
 
 
 @admin_bp.route("/accounts", methods=["GET"])
 @require_admin
 def list_accounts():
     """List all accounts."""
-    accounts = Account.query.order_by(Account.created_at.desc()).all()
+    # character_count comes back as a correlated COUNT in the same SELECT;
+    # raiseload: any relationship to_dict() starts touching fails loudly instead of going N+1
+    accounts = (Account.query.options(undefer(Account.character_count), raiseload("*"))
+                .order_by(Account.created_at.desc()).all())
     return jsonify({"accounts": [a.to_dict() for a in accounts]}), 200
 
 
@@ -27,25 +38,24 @@ def list_accounts():
 @require_admin
 def list_all_characters():
     """List all characters across all accounts."""
-    characters = Character.query.order_by(Character.created_at.desc()).all()
-    return jsonify({"characters": [c.to_summary() for c in characters]}), 200
+    return jsonify({"characters": Character.summary_rows(order_by=Character.created_at.desc())}), 200
 
 
-@admin_bp.route("/character/<character_id>", methods=["GET"])
+@admin_bp.route("/character/<uuid:character_id>", methods=["GET"])
 @require_admin
 def get_character_detail(character_id):
     """Get full character data for admin inspection."""
-    char = Character.query.get(character_id)
+    char = db.session.get(Character, character_id)
     if not char:
         return jsonify({"error": "Character not found"}), 404
     return jsonify({"character": char.to_dict()}), 200
 
 
-@admin_bp.route("/character/<character_id>/set-rank", methods=["POST"])
+@admin_bp.route("/character/<uuid:character_id>/set-rank", methods=["POST"])
 @require_admin
 def set_rank(character_id):
     """Set a character's RP rank."""
-    character = Character.query.get(character_id)
+    character = db.session.get(Character, character_id)
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
@@ -53,7 +63,7 @@ def set_rank(character_id):
     rank = data.get("rank", "")
 
     if rank not in VALID_RANKS:
-        return jsonify({"error": f"Invalid rank. Must be one of: {', '.join(VALID_RANKS)}"}), 400
+        return jsonify({"error": INVALID_RANK_ERROR}), 400
 
     old_rank = character.rp_rank
     character.rp_rank = rank
@@ -65,27 +75,29 @@ def set_rank(character_id):
     }), 200
 
 
-@admin_bp.route("/character/<character_id>/grant-stats", methods=["POST"])
+@admin_bp.route("/character/<uuid:character_id>/grant-stats", methods=["POST"])
 @require_admin
 def grant_stats(character_id):
     """Grant bonus stat points to a character."""
-    character = Character.query.get(character_id)
+    character = db.session.get(Character, character_id)
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
     data = request.get_json()
     grants = data.get("grants", {})
 
-    applied = {}
-    for stat_name, amount in grants.items():
-        if stat_name in VALID_STATS and isinstance(amount, int) and amount > 0:
-            current = getattr(character, stat_name)
-            setattr(character, stat_name, current + amount)
-            applied[stat_name] = amount
-
+    applied = {
+        stat_name: amount for stat_name, amount in grants.items()
+        if stat_name in VALID_STATS and isinstance(amount, int) and amount > 0
+    }
     if not applied:
         return jsonify({"error": "No valid stat grants provided."}), 400
 
+    # One UPDATE ... SET stat = stat + n — atomic increments, no per-attribute dirty tracking
+    db.session.execute(
+        update(Character).where(Character.id == character.id)
+        .values({getattr(Character, k): getattr(Character, k) + v for k, v in applied.items()})
+    )
     db.session.commit()
 
     return jsonify({
@@ -94,11 +106,11 @@ def grant_stats(character_id):
     }), 200
 
 
-@admin_bp.route("/account/<account_id>/ban", methods=["POST"])
+@admin_bp.route("/account/<uuid:account_id>/ban", methods=["POST"])
 @require_admin
 def ban_account(account_id):
     """Ban or unban an account."""
-    account = Account.query.get(account_id)
+    account = db.session.get(Account, account_id)
     if not account:
         return jsonify({"error": "Account not found."}), 404
 
@@ -115,11 +127,11 @@ def ban_account(account_id):
     return jsonify({"message": f"Account '{account.username}' {action}."}), 200
 
 
-@admin_bp.route("/character/<character_id>/set-rpp", methods=["POST"])
+@admin_bp.route("/character/<uuid:character_id>/set-rpp", methods=["POST"])
 @require_admin
 def set_rpp(character_id):
     """Grant, remove, or set RPP for a character."""
-    character = Character.query.get(character_id)
+    character = db.session.get(Character, character_id)
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
@@ -147,11 +159,11 @@ def set_rpp(character_id):
     }), 200
 
 
-@admin_bp.route("/character/<character_id>/set-tp", methods=["POST"])
+@admin_bp.route("/character/<uuid:character_id>/set-tp", methods=["POST"])
 @require_admin
 def set_tp(character_id):
     """Grant, remove, or set Training Points for a character."""
-    character = Character.query.get(character_id)
+    character = db.session.get(Character, character_id)
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
@@ -179,27 +191,26 @@ def set_tp(character_id):
     }), 200
 
 
-@admin_bp.route("/character/<character_id>/set-stats", methods=["POST"])
+@admin_bp.route("/character/<uuid:character_id>/set-stats", methods=["POST"])
 @require_admin
 def set_stats(character_id):
     """Set individual stat values (overwrites, not adds)."""
-    character = Character.query.get(character_id)
+    character = db.session.get(Character, character_id)
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
     data = request.get_json()
     stats = data.get("stats", {})
 
-    applied = {}
-    for stat_name, value in stats.items():
-        if stat_name in VALID_STATS and isinstance(value, int) and value >= 0:
-            old = getattr(character, stat_name)
-            setattr(character, stat_name, value)
-            applied[stat_name] = f"{old} → {value}"
-
-    if not applied:
+    values = {
+        stat_name: value for stat_name, value in stats.items()
+        if stat_name in VALID_STATS and isinstance(value, int) and value >= 0
+    }
+    if not values:
         return jsonify({"error": "No valid stat overrides provided."}), 400
 
+    applied = {k: f"{getattr(character, k)} → {v}" for k, v in values.items()}
+    db.session.execute(update(Character).where(Character.id == character.id).values(values))
     db.session.commit()
     return jsonify({
         "message": f"Stats set for {character.name}: {applied}",
@@ -207,11 +218,11 @@ def set_stats(character_id):
     }), 200
 
 
-@admin_bp.route("/character/<character_id>/set-level", methods=["POST"])
+@admin_bp.route("/character/<uuid:character_id>/set-level", methods=["POST"])
 @require_admin
 def set_level(character_id):
     """Set character level by evenly distributing stat points."""
-    character = Character.query.get(character_id)
+    character = db.session.get(Character, character_id)
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
@@ -229,7 +240,7 @@ def set_level(character_id):
 
     if rank is not None:
         if rank not in VALID_RANKS:
-            return jsonify({"error": f"Invalid rank. Must be one of: {', '.join(VALID_RANKS)}"}), 400
+            return jsonify({"error": INVALID_RANK_ERROR}), 400
         character.rp_rank = rank
 
     db.session.commit()
@@ -239,17 +250,15 @@ def set_level(character_id):
     }), 200
 
 
-@admin_bp.route("/character/<character_id>/reset-training", methods=["POST"])
+@admin_bp.route("/character/<uuid:character_id>/reset-training", methods=["POST"])
 @require_admin
 def reset_training(character_id):
     """Force reset daily training cooldowns for a character."""
-    character = Character.query.get(character_id)
+    character = db.session.get(Character, character_id)
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
-    character.daily_tp_earned = 0
-    character.daily_rp_sessions = 0
-    character.last_reset_date = ""
+    db.session.execute(update(Character).where(Character.id == character.id).values(TRAINING_RESET))
     db.session.commit()
 
     return jsonify({
@@ -258,11 +267,24 @@ def reset_training(character_id):
     }), 200
 
 
-@admin_bp.route("/account/<account_id>/set-admin", methods=["POST"])
+@admin_bp.route("/reset-training-all", methods=["POST"])
+@require_admin
+def reset_training_all():
+    """Force reset daily training cooldowns for every character — one UPDATE, no rows loaded."""
+    result = db.session.execute(update(Character).values(TRAINING_RESET))
+    db.session.commit()
+
+    return jsonify({
+        "message": f"Daily training reset for {result.rowcount} characters.",
+        "count": result.rowcount,
+    }), 200
+
+
+@admin_bp.route("/account/<uuid:account_id>/set-admin", methods=["POST"])
 @require_admin
 def set_admin(account_id):
     """Promote or demote an account to/from admin. Only admins can do this."""
-    account = Account.query.get(account_id)
+    account = db.session.get(Account, account_id)
     if not account:
         return jsonify({"error": "Account not found."}), 404
 
@@ -298,13 +320,14 @@ def announce():
 
     # Push to all connected clients via socket
     from socketio_server import broadcast_announcement
-    broadcast_announcement(message, g.current_account.username)
+    if not broadcast_announcement(message, g.current_account.username):
+        return jsonify({"error": "Announcements need the socketio feature or REDIS_URL on this worker."}), 503
 
     return jsonify({
         "message": f"Announced: {message}",
         "announcement": {
             "text": message,
             "admin": g.current_account.username,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.now(timezone.utc),
         }
     }), 200
@@ -3,34 +3,67 @@ Authentication routes: register, login, logout, session validation.
 Uses JWT tokens stored client-side (Godot will send in Authorization header).
 """
 import os
-from datetime import datetime, timedelta, timezone
+import time
+import uuid
 from functools import wraps
 
 import jwt
-from flask import Blueprint, request, jsonify, g
+import redis
+from flask import Blueprint, current_app, request, jsonify, g
+from sqlalchemy import func
+from sqlalchemy.orm.attributes import set_committed_value
 
+import jwt_hs256
 from database import db
-from models import Account, Character
+from models import Account, Character, CHARACTER_DETAIL_OPTIONS
 
 auth_bp = Blueprint("auth", __name__)
 
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
 TOKEN_EXPIRY_HOURS = 72  # 3 days
 
+# Password checks (argon2) per client IP per minute — caps CPU spent on credential stuffing
+PASSWORD_ATTEMPTS_PER_MINUTE = 10
+REDIS_URL = os.getenv("REDIS_URL")
+
 
 # ═════════════════════════════════════════════════════════════
 #  JWT HELPERS
 # ═════════════════════════════════════════════════════════════
 
 def create_token(account):
+    now = int(time.time())  # JWT times are Unix seconds — no datetime round-trip
     payload = {
-        "sub": account.id,
+        "sub": str(account.id),
         "username": account.username,
         "is_admin": account.is_admin,
-        "exp": datetime.now(timezone.utc) + timedelta(hours=TOKEN_EXPIRY_HOURS),
-        "iat": datetime.now(timezone.utc),
+        "exp": now + TOKEN_EXPIRY_HOURS * 3600,
+        "iat": now,
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+    return jwt_hs256.encode(payload, SECRET_KEY)
+
+
+# token → (payload, reuse_until). Skips HMAC + JSON decode for a client's repeat calls.
+# Only the verified payload is cached — the account row (ban flag, admin flag) is still
+# read fresh on every request.
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_MAX = 10_000
+_token_cache = {}
+
+
+def decode_token(token):
+    """HS256 decode with a short-lived per-process cache. Raises the usual jwt errors."""
+    now = time.time()
+    hit = _token_cache.get(token)
+    if hit is not None and hit[1] > now:
+        return hit[0]
+
+    payload = jwt_hs256.decode(token, SECRET_KEY)
+    if len(_token_cache) >= TOKEN_CACHE_MAX:
+        _token_cache.clear()
+    # Never reuse past the token's own expiry
+    _token_cache[token] = (payload, min(now + TOKEN_CACHE_TTL, payload.get("exp", now)))
+    return payload
 
 
 def require_auth(f):
@@ -47,8 +80,8 @@ def require_auth(f):
             return jsonify({"error": "No token provided"}), 401
 
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-            account = Account.query.get(payload["sub"])
+            payload = decode_token(token)
+            account = db.session.get(Account, uuid.UUID(payload["sub"]))
 
             if not account:
                 return jsonify({"error": "Account not found"}), 401
@@ -58,7 +91,7 @@ def require_auth(f):
             g.current_account = account
         except jwt.ExpiredSignatureError:
             return jsonify({"error": "Token expired"}), 401
-        except jwt.InvalidTokenError:
+        except (jwt.InvalidTokenError, ValueError):
             return jsonify({"error": "Invalid token"}), 401
 
         return f(*args, **kwargs)
@@ -78,6 +111,79 @@ def require_admin(f):
     return decorated
 
 
+# ─── HTTP CACHING ────────────────────────────────────────────
+# For polled GETs: the client may reuse a response for max_age seconds without asking,
+# then revalidates with If-None-Match and gets an empty 304 if nothing changed.
+# A view that can name its version from row state sets that ETag itself and returns
+# not_modified() before any further queries or serialization; otherwise the finished
+# body is hashed, which saves only bandwidth.
+def private_cache(max_age=2):
+    """Decorator adding Cache-Control: private + an ETag (the view's, or a body hash) to 200/304 responses."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.cache_control.private = True
+                response.cache_control.max_age = max_age
+                response.vary.add("Authorization")  # same URL, different account
+            if response.status_code == 200:
+                if response.get_etag()[0] is None:
+                    response.add_etag()
+                response.make_conditional(request)
+            return response
+
+        return decorated
+
+    return decorator
+
+
+def not_modified(etag):
+    """Empty 304 carrying etag — for views that check If-None-Match before doing the work."""
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+# ─── PASSWORD RATE LIMIT ─────────────────────────────────────
+# Fixed one-minute window per IP. Shared through Redis when REDIS_URL is set (every
+# worker sees the same count); otherwise counted in this process only.
+# Short socket timeouts: an unreachable Redis (dropped packets, not refused) must fall back
+# to the local count within a fraction of a second, not hang the login on the OS TCP timeout.
+# from_url doesn't connect; the pool connects on first use.
+_redis = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.2, socket_timeout=0.2) if REDIS_URL else None
+_attempts = {}  # (ip, minute) → attempts, single-process fallback
+
+
+def _too_many_password_attempts(ip):
+    window = int(time.time() // 60)
+    if _redis is not None:
+        key = f"pw-attempts:{ip}:{window}"
+        pipe = _redis.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, 60)
+        try:
+            return pipe.execute()[0] > PASSWORD_ATTEMPTS_PER_MINUTE
+        except redis.RedisError:
+            pass  # Redis down → count in this process rather than failing the login
+    if len(_attempts) > 10_000:  # drop finished windows
+        for k in [k for k in _attempts if k[1] != window]:
+            del _attempts[k]
+    count = _attempts[(ip, window)] = _attempts.get((ip, window), 0) + 1
+    return count > PASSWORD_ATTEMPTS_PER_MINUTE
+
+
+def limit_password_attempts(f):
+    """Decorator: 429 before any password hashing once an IP exceeds the per-minute budget."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if _too_many_password_attempts(request.remote_addr):
+            return jsonify({"error": "Too many attempts. Try again in a minute."}), 429
+        return f(*args, **kwargs)
+
+    return decorated
+
+
 # ═════════════════════════════════════════════════════════════
 #  ROUTES
 # ═════════════════════════════════════════════════════════════
@@ -136,6 +242,7 @@ def register():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@limit_password_attempts
 def login():
     """Log in with username/email and password."""
     data = request.get_json()
@@ -145,11 +252,12 @@ def login():
 
     identifier = data.get("username", "").strip()  # Can be username or email
     password = data.get("password", "")
+    if not identifier or not password:
+        return jsonify({"error": "Invalid username or password."}), 401
 
-    # Find by username or email
-    account = Account.query.filter(
-        (Account.username == identifier) | (Account.email == identifier.lower())
-    ).first()
+    # Find by username, then email — two unique-index probes instead of one OR scan
+    account = (Account.query.filter_by(username=identifier).first()
+               or Account.query.filter_by(email=identifier.lower()).first())
 
     if not account or not account.check_password(password):
         return jsonify({"error": "Invalid username or password."}), 401
@@ -162,8 +270,8 @@ def login():
     if account.email == OWNER_EMAIL and not account.is_admin:
         account.is_admin = True
 
-    # Update last login
-    account.last_login = datetime.now(timezone.utc)
+    # Update last login — stamped by the DB clock, like the column server defaults
+    account.last_login = func.now()
     db.session.commit()
 
     token = create_token(account)
@@ -177,6 +285,7 @@ def login():
 
 @auth_bp.route("/me", methods=["GET"])
 @require_auth
+@private_cache()
 def me():
     """Get current account info (validates token)."""
     return jsonify({"account": g.current_account.to_dict()}), 200
@@ -188,13 +297,15 @@ def resume():
     """Validate token and return account + all character data in one call.
     Replaces: /auth/me + /characters/ + /characters/{id} for returning players."""
     account = g.current_account
-    characters = Character.query.filter_by(account_id=account.id).all()
+    characters = Character.query.options(*CHARACTER_DETAIL_OPTIONS).filter_by(account_id=account.id).all()
+    # The rows are already here — fill the deferred COUNT instead of issuing it
+    set_committed_value(account, "character_count", len(characters))
 
-    slots = {1: None, 2: None, 3: None}
+    slots = {"1": None, "2": None, "3": None}
     full_characters = {}
     for char in characters:
-        slots[char.slot] = char.to_summary()
-        full_characters[char.id] = char.to_dict()
+        slots[str(char.slot)] = char.to_summary()
+        full_characters[str(char.id)] = char.to_dict()
 
     return jsonify({
         "account": account.to_dict(),
@@ -205,6 +316,7 @@ def resume():
 
 @auth_bp.route("/change-password", methods=["POST"])
 @require_auth
+@limit_password_attempts
 def change_password():
     """Change account password."""
     data = request.get_json()
@@ -1,47 +1,65 @@
 """
 Character routes: CRUD, training (12 PM EST reset), RP sessions, name checking.
 """
+import re
 from datetime import datetime, timezone
+from types import MappingProxyType
 
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, current_app, request, jsonify, g
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.exc import IntegrityError
 
 from database import db
 from models import Character
 from routes.auth import require_auth
 from daily_reset import (
-    check_and_reset, award_rp_session_tp, seconds_until_next_reset,
-    get_current_reset_period, calc_training_cost, get_lowest_stat
+    check_and_reset, award_rp_session_tp, next_reset_at, seconds_until_next_reset,
+    calc_training_cost, get_lowest_stat, plan_training
 )
 
 characters_bp = Blueprint("characters", __name__)
 
 MAX_CHARACTERS = 3
-VALID_CITIES = ["Lumere", "Praeven", "Caldris"]
-VALID_RACES = [
+# 2-30 chars: a letter, then letters / spaces / apostrophes / hyphens
+NAME_RE = re.compile(r"[A-Za-z][A-Za-z' \-]{1,29}")
+INVALID_NAME_ERROR = "Name must start with a letter and use only letters, spaces, apostrophes or hyphens."
+VALID_SLOTS = frozenset(range(1, MAX_CHARACTERS + 1))
+# How a uq_account_slot violation reads: Postgres names the constraint, SQLite lists its columns
+SLOT_CONFLICT_MARKERS = ("uq_account_slot", "characters.account_id, characters.slot")
+# Tuples keep display order for the error messages; frozensets answer the `in` checks
+CITY_ORDER = ("Lumere", "Praeven", "Caldris")
+RACE_ORDER = (
     "Human", "Gorath", "Sythari", "Fenric", "Valdren",
     "Kaerath", "Nexari", "Ashborn", "Delvari", "Verskai"
-]
+)
+VALID_CITIES = frozenset(CITY_ORDER)
+VALID_RACES = frozenset(RACE_ORDER)
+INVALID_CITY_ERROR = f"City must be one of: {', '.join(CITY_ORDER)}"
+INVALID_RACE_ERROR = f"Race must be one of: {', '.join(RACE_ORDER)}"
 
 # City → allowed races
-CITY_RACES = {
-    "Lumere":  ["Human", "Valdren", "Kaerath", "Delvari", "Ashborn", "Nexari"],
-    "Praeven": ["Human", "Sythari", "Kaerath", "Delvari", "Ashborn", "Nexari"],
-    "Caldris": ["Human", "Gorath", "Fenric", "Verskai", "Kaerath", "Delvari", "Ashborn", "Nexari"],
-}
-
-# Race → stat modifiers (mirrors RaceData.cs)
-RACE_MODS = {
-    "Human":   {"hp": 1.05, "sta": 1.05, "ae": 1.05, "atk": 1.05, "eatk": 1.05, "avd": 1.05, "regen": 1.05},
-    "Gorath":  {"hp": 1.25, "sta": 1.25, "ae": 0.90, "atk": 1.20, "eatk": 0.90, "avd": 0.90, "regen": 1.00},
-    "Sythari": {"hp": 1.00, "sta": 0.90, "ae": 1.10, "atk": 1.00, "eatk": 1.15, "avd": 1.10, "regen": 1.00},
-    "Fenric":  {"hp": 1.10, "sta": 1.15, "ae": 0.95, "atk": 1.15, "eatk": 0.95, "avd": 1.10, "regen": 1.00},
-    "Valdren": {"hp": 1.15, "sta": 1.10, "ae": 1.20, "atk": 1.00, "eatk": 1.00, "avd": 1.00, "regen": 1.25},
-    "Kaerath": {"hp": 1.00, "sta": 1.15, "ae": 1.05, "atk": 1.10, "eatk": 1.00, "avd": 1.15, "regen": 1.10},
-    "Nexari":  {"hp": 1.05, "sta": 0.95, "ae": 1.15, "atk": 1.00, "eatk": 1.05, "avd": 1.05, "regen": 1.15},
-    "Ashborn": {"hp": 1.10, "sta": 1.05, "ae": 1.15, "atk": 1.00, "eatk": 1.15, "avd": 0.95, "regen": 1.00},
-    "Delvari": {"hp": 1.00, "sta": 0.95, "ae": 1.10, "atk": 1.00, "eatk": 1.10, "avd": 1.05, "regen": 1.15},
-    "Verskai": {"hp": 1.05, "sta": 1.10, "ae": 1.10, "atk": 1.10, "eatk": 1.05, "avd": 1.10, "regen": 1.00},
-}
+CITY_RACES = MappingProxyType({
+    "Lumere":  frozenset(("Human", "Valdren", "Kaerath", "Delvari", "Ashborn", "Nexari")),
+    "Praeven": frozenset(("Human", "Sythari", "Kaerath", "Delvari", "Ashborn", "Nexari")),
+    "Caldris": frozenset(("Human", "Gorath", "Fenric", "Verskai", "Kaerath", "Delvari", "Ashborn", "Nexari")),
+})
+# Race → stat modifiers (mirrors RaceData.cs) live in models.RACE_MODS
+
+# Training stat names + short aliases accepted by /train
+STAT_ALIASES = MappingProxyType({
+    "strength": "strength", "str": "strength",
+    "vitality": "vitality", "vit": "vitality",
+    "agility": "agility", "agi": "agility",
+    "dexterity": "dexterity", "dex": "dexterity",
+    "mind": "mind", "mnd": "mind",
+    "ether_control": "ether_control", "etc": "ether_control",
+})
+# Tables cascade-deleted with a character (the delete-orphan relationships on Character)
+CHARACTER_CHILD_MODELS = tuple(
+    rel.mapper.class_ for rel in Character.__mapper__.relationships if rel.cascade.delete_orphan
+)
+# The only fields a client save (PUT /<id>) may write
+UPDATE_FIELDS = ("bio", "current_hp", "current_stamina", "current_aether")
 
 
 # ═══════════════════════════════════════════════════════════
@@ -52,13 +70,9 @@ RACE_MODS = {
 @require_auth
 def get_characters():
     """Get all character slots for the logged-in account."""
-    characters = Character.query.filter_by(
-        account_id=g.current_account.id
-    ).all()
-
-    slots = {1: None, 2: None, 3: None}
-    for char in characters:
-        slots[char.slot] = char.to_summary()
+    slots = {"1": None, "2": None, "3": None}
+    for summary in Character.summary_rows(Character.account_id == g.current_account.id):
+        slots[str(summary["slot"])] = summary
 
     return jsonify({"slots": slots}), 200
 
@@ -67,7 +81,7 @@ def get_characters():
 @require_auth
 def create_character():
     """Create a new character in a slot."""
-    data = request.get_json()
+    data = request.get_json(silent=True)
 
     if not data:
         return jsonify({"error": "No data provided"}), 400
@@ -83,13 +97,15 @@ def create_character():
 
     if not name or len(name) < 2 or len(name) > 30:
         errors.append("Name must be 2-30 characters.")
+    elif not NAME_RE.fullmatch(name):
+        errors.append(INVALID_NAME_ERROR)
     if city not in VALID_CITIES:
-        errors.append(f"City must be one of: {', '.join(VALID_CITIES)}")
+        errors.append(INVALID_CITY_ERROR)
     if race not in VALID_RACES:
-        errors.append(f"Race must be one of: {', '.join(VALID_RACES)}")
+        errors.append(INVALID_RACE_ERROR)
     elif city in CITY_RACES and race not in CITY_RACES[city]:
         errors.append(f"{race} cannot start in {city}.")
-    if slot not in [1, 2, 3]:
+    if slot not in VALID_SLOTS:
         errors.append("Slot must be 1, 2, or 3.")
     if len(bio) > 500:
         errors.append("Bio cannot exceed 500 characters.")
@@ -97,25 +113,7 @@ def create_character():
     if errors:
         return jsonify({"error": errors}), 400
 
-    # Check slot availability
-    existing = Character.query.filter_by(
-        account_id=g.current_account.id, slot=slot
-    ).first()
-    if existing:
-        return jsonify({"error": f"Slot {slot} is already occupied."}), 409
-
-    # Check character count
-    count = Character.query.filter_by(account_id=g.current_account.id).count()
-    if count >= MAX_CHARACTERS:
-        return jsonify({"error": f"Maximum {MAX_CHARACTERS} characters allowed."}), 409
-
-    # Check name uniqueness
-    if Character.query.filter_by(name=name).first():
-        return jsonify({"error": "Character name already taken."}), 409
-
     # ─── CREATE ──────────────────────────────────────────
-    mods = RACE_MODS.get(race, RACE_MODS["Human"])
-
     character = Character(
         account_id=g.current_account.id,
         slot=slot,
@@ -132,13 +130,6 @@ def create_character():
         mind=1,
         ether_control=1,
         training_points_bank=0,
-        race_hp_mod=mods["hp"],
-        race_stamina_mod=mods["sta"],
-        race_aether_mod=mods["ae"],
-        race_atk_mod=mods["atk"],
-        race_eatk_mod=mods["eatk"],
-        race_avd_mod=mods["avd"],
-        race_regen_mod=mods["regen"],
     )
 
     # Initialize HP/Ether to max
@@ -147,7 +138,17 @@ def create_character():
     character.current_aether = character.max_aether
 
     db.session.add(character)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        message = str(e.orig)
+        if "ix_char_name_lower" in message:
+            return jsonify({"error": "Character name already taken."}), 409
+        # uq_account_slot — one character per slot also caps the account at MAX_CHARACTERS
+        if any(marker in message for marker in SLOT_CONFLICT_MARKERS):
+            return jsonify({"error": f"Slot {slot} is already occupied."}), 409
+        raise
 
     return jsonify({
         "message": f"Character '{name}' created.",
@@ -155,13 +156,11 @@ def create_character():
     }), 201
 
 
-@characters_bp.route("/<character_id>", methods=["GET"])
+@characters_bp.route("/<uuid:character_id>", methods=["GET"])
 @require_auth
 def get_character(character_id):
     """Get full character data by ID."""
-    character = Character.query.filter_by(
-        id=character_id, account_id=g.current_account.id
-    ).first()
+    character = _owned_character(character_id)
 
     if not character:
         return jsonify({"error": "Character not found."}), 404
@@ -169,27 +168,26 @@ def get_character(character_id):
     return jsonify({"character": character.to_dict()}), 200
 
 
-@characters_bp.route("/<character_id>", methods=["PUT"])
+@characters_bp.route("/<uuid:character_id>", methods=["PUT"])
 @require_auth
 def update_character(character_id):
     """Update character data (client save)."""
-    character = Character.query.filter_by(
-        id=character_id, account_id=g.current_account.id
-    ).first()
+    character = _owned_character(character_id)
 
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
 
-    # Only allow updating specific fields from client
-    allowed_fields = ["bio", "current_hp", "current_stamina", "current_aether"]
-
-    for field in allowed_fields:
-        if field in data:
+    mutated = False
+    for field in UPDATE_FIELDS:
+        if field in data and data[field] != getattr(character, field):
             setattr(character, field, data[field])
+            mutated = True
 
-    db.session.commit()
+    # Nothing changed → no UPDATE, no commit
+    if mutated:
+        db.session.commit()
 
     return jsonify({
         "message": "Character updated.",
@@ -197,19 +195,15 @@ def update_character(character_id):
     }), 200
 
 
-@characters_bp.route("/<character_id>", methods=["DELETE"])
+@characters_bp.route("/<uuid:character_id>", methods=["DELETE"])
 @require_auth
 def delete_character(character_id):
     """Delete a character."""
-    character = Character.query.filter_by(
-        id=character_id, account_id=g.current_account.id
-    ).first()
+    name = _delete_owned_character(character_id)
 
-    if not character:
+    if name is None:
         return jsonify({"error": "Character not found."}), 404
 
-    name = character.name
-    db.session.delete(character)
     db.session.commit()
 
     return jsonify({"message": f"Character '{name}' deleted."}), 200
@@ -219,7 +213,7 @@ def delete_character(character_id):
 #  TRAINING (SERVER-AUTHORITATIVE, 12:00 PM EST RESET)
 # ═══════════════════════════════════════════════════════════
 
-@characters_bp.route("/<character_id>/train", methods=["POST"])
+@characters_bp.route("/<uuid:character_id>/train", methods=["POST"])
 @require_auth
 def train_stat(character_id):
     """
@@ -227,35 +221,23 @@ def train_stat(character_id):
     TP bank carries over between days — 12 PM EST reset only affects RP counters.
     Soft cap: gap 10-19 = 2 TP per point, gap 20+ = 4 TP per point.
     """
-    character = Character.query.filter_by(
-        id=character_id, account_id=g.current_account.id
-    ).first()
+    character = _owned_character(character_id)
 
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
     # Always check reset on any training action
-    check_and_reset(character)
+    check_and_reset(character, g.current_reset_period)
 
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     stat = data.get("stat", "").lower()
     points = data.get("points", 1)
 
-    valid_stats = {
-        "strength": "strength", "str": "strength",
-        "vitality": "vitality", "vit": "vitality",
-        "agility": "agility", "agi": "agility",
-        "dexterity": "dexterity", "dex": "dexterity",
-        "mind": "mind", "mnd": "mind",
-        "ether_control": "ether_control", "etc": "ether_control",
-    }
-
-    if stat not in valid_stats:
+    stat_name = STAT_ALIASES.get(stat)
+    if stat_name is None:
         return jsonify({"error": f"Invalid stat: '{stat}'"}), 400
 
-    stat_name = valid_stats[stat]
-
-    if points < 1:
+    if not isinstance(points, int) or points < 1:
         return jsonify({"error": "Must allocate at least 1 point."}), 400
 
     if character.training_points_bank <= 0:
@@ -265,22 +247,12 @@ def train_stat(character_id):
         }), 400
 
     # ── SERVER-SIDE SOFT CAP ENFORCEMENT ──
-    # Simulate allocation point-by-point to enforce correct TP costs
+    # Same result as buying point-by-point at calc_training_cost, solved per cost tier
     lowest = get_lowest_stat(character)
     current_val = getattr(character, stat_name)
     tp_available = character.training_points_bank
 
-    total_gained = 0
-    total_spent = 0
-    sim_val = current_val
-
-    for _ in range(points):
-        cost = calc_training_cost(sim_val, lowest)
-        if total_spent + cost > tp_available:
-            break
-        total_spent += cost
-        sim_val += 1
-        total_gained += 1
+    total_gained, total_spent = plan_training(current_val, lowest, points, tp_available)
 
     if total_gained == 0:
         cost_needed = calc_training_cost(current_val, lowest)
@@ -312,7 +284,7 @@ def train_stat(character_id):
 #  RP SESSION → TP EARNING (SERVER-AUTHORITATIVE)
 # ═══════════════════════════════════════════════════════════
 
-@characters_bp.route("/<character_id>/rp-session", methods=["POST"])
+@characters_bp.route("/<uuid:character_id>/rp-session", methods=["POST"])
 @require_auth
 def complete_rp_session(character_id):
     """
@@ -326,18 +298,17 @@ def complete_rp_session(character_id):
       - At least 1 other player
       - Anti-spam check passed (no copy-paste)
     """
-    character = Character.query.filter_by(
-        id=character_id, account_id=g.current_account.id
-    ).first()
+    character = _owned_character(character_id)
 
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
-    tp_awarded, total_earned, at_cap = award_rp_session_tp(character)
-    db.session.commit()
+    tp_awarded, total_earned, at_cap = award_rp_session_tp(character, g.current_reset_period)
 
+    # Build the response before committing — reading expired attributes after the
+    # commit would cost a refresh SELECT
     if tp_awarded == 0 and at_cap:
-        return jsonify({
+        payload = {
             "message": "Daily TP cap reached. New TP available after reset.",
             "tp_awarded": 0,
             "daily_tp_earned": total_earned,
@@ -345,50 +316,65 @@ def complete_rp_session(character_id):
             "training_points_bank": character.training_points_bank,
             "at_cap": True,
             "seconds_until_reset": seconds_until_next_reset(),
-        }), 200
+        }
+    else:
+        payload = {
+            "message": f"RP session complete! +{tp_awarded} TP earned.",
+            "tp_awarded": tp_awarded,
+            "daily_tp_earned": total_earned,
+            "daily_tp_cap": character.daily_tp_cap,
+            "daily_rp_sessions": character.daily_rp_sessions,
+            "training_points_bank": character.training_points_bank,
+            "at_cap": at_cap,
+            "seconds_until_reset": seconds_until_next_reset(),
+        }
+    db.session.commit()
 
-    return jsonify({
-        "message": f"RP session complete! +{tp_awarded} TP earned.",
-        "tp_awarded": tp_awarded,
-        "daily_tp_earned": total_earned,
-        "daily_tp_cap": character.daily_tp_cap,
-        "daily_rp_sessions": character.daily_rp_sessions,
-        "training_points_bank": character.training_points_bank,
-        "at_cap": at_cap,
-        "seconds_until_reset": seconds_until_next_reset(),
-    }), 200
+    return jsonify(payload), 200
 
 
 # ═══════════════════════════════════════════════════════════
 #  TRAINING STATUS (read-only, for UI countdown)
 # ═══════════════════════════════════════════════════════════
 
-@characters_bp.route("/<character_id>/training-status", methods=["GET"])
+@characters_bp.route("/<uuid:character_id>/training-status", methods=["GET"])
 @require_auth
 def training_status(character_id):
     """
     Current training period info for the UI timer and badge.
     Triggers reset check so client always sees fresh data.
     """
-    character = Character.query.filter_by(
-        id=character_id, account_id=g.current_account.id
-    ).first()
+    character = _owned_character(character_id)
 
     if not character:
         return jsonify({"error": "Character not found."}), 404
 
-    check_and_reset(character)
-    db.session.commit()
+    was_reset = check_and_reset(character, g.current_reset_period)
+    # Every field is fixed until the period or its counters change — the reset is sent as an
+    # absolute reset_at (the period's end), not a countdown a 304 would freeze. Clients
+    # count down from reset_at themselves.
+    etag = (f"{character.id}-{g.current_reset_period}-{character.daily_rp_sessions}-"
+            f"{character.daily_tp_earned}-{character.training_points_bank}-{character.character_level}")
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify({
+            "training_points_bank": character.training_points_bank,
+            "daily_tp_earned": character.daily_tp_earned,
+            "daily_tp_cap": character.daily_tp_cap,
+            "daily_rp_sessions": character.daily_rp_sessions,
+            "reset_period": g.current_reset_period,
+            "reset_at": next_reset_at(),
+            "character_level": character.character_level,
+        })
+    # Only the first poll after a reset has anything to write
+    if was_reset:
+        db.session.commit()
 
-    return jsonify({
-        "training_points_bank": character.training_points_bank,
-        "daily_tp_earned": character.daily_tp_earned,
-        "daily_tp_cap": character.daily_tp_cap,
-        "daily_rp_sessions": character.daily_rp_sessions,
-        "reset_period": get_current_reset_period(),
-        "seconds_until_reset": seconds_until_next_reset(),
-        "character_level": character.character_level,
-    }), 200
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 
 # ═══════════════════════════════════════════════════════════
@@ -403,10 +389,45 @@ def check_name():
 
     if not name or len(name) < 2:
         return jsonify({"available": False, "reason": "Name too short."}), 200
-
-    existing = Character.query.filter_by(name=name).first()
+    # Typing noise never reaches the DB
+    if not NAME_RE.fullmatch(name):
+        return jsonify({"available": False, "reason": "Invalid characters."}), 200
 
     return jsonify({
-        "available": existing is None,
+        "available": not _name_taken(name),
         "name": name,
     }), 200
+
+
+# ═══════════════════════════════════════════════════════════
+#  HELPERS
+# ═══════════════════════════════════════════════════════════
+
+def _owned_character(character_id):
+    """The caller's character by primary key (identity-map hit if already loaded), else None."""
+    character = db.session.get(Character, character_id)
+    if character is None or character.account_id != g.current_account.id:
+        return None
+    return character
+
+
+def _delete_owned_character(character_id):
+    """
+    Delete the caller's character and its abilities / gear / inventory with one DELETE
+    per table — no SELECT of the row or its collections first. Returns the deleted
+    character's name, or None if it isn't theirs (nothing is deleted then).
+    """
+    owned = (Character.id == character_id, Character.account_id == g.current_account.id)
+    # None of these rows are loaded in this request, so skip syncing the identity map
+    no_sync = {"synchronize_session": False}
+    for child in CHARACTER_CHILD_MODELS:
+        db.session.execute(
+            delete(child).where(child.character_id.in_(select(Character.id).where(*owned))),
+            execution_options=no_sync,
+        )
+    return db.session.scalar(delete(Character).where(*owned).returning(Character.name), execution_options=no_sync)
+
+
+def _name_taken(name):
+    """SELECT EXISTS on ix_char_name_lower — the DB returns one boolean, no Character row."""
+    return db.session.scalar(select(exists().where(func.lower(Character.name) == name.lower())))
@@ -2,26 +2,46 @@
 Equipment routes: equip/unequip gear, inventory management.
 Equipment slots: main_hand, off_hand, head, body, legs, feet, ring, amulet
 """
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, current_app, request, jsonify, g
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
 
 from database import db
-from models import Character, CharacterEquipment, CharacterInventory, ItemDefinition
+from models import (
+    Character, CharacterEquipment, CharacterInventory,
+    item_catalog, item_catalog_json, item_definition_dict,
+)
 from routes.auth import require_auth
 
 equipment_bp = Blueprint("equipment", __name__)
 
-VALID_SLOTS = ["main_hand", "off_hand", "head", "body", "legs", "feet", "ring", "amulet"]
+VALID_SLOTS = frozenset(("main_hand", "off_hand", "head", "body", "legs", "feet", "ring", "amulet"))
+
+# Gear and inventory loaded with the character: equipment (at most one row per slot) is
+# joined onto the character row, inventory comes in one IN (...) SELECT. Routes then find
+# the rows they touch in these collections instead of querying for each one.
+# Items serialize from the process cache, never per row.
+GEAR_OPTIONS = (
+    joinedload(Character.equipment),
+    selectinload(Character.inventory),
+    raiseload("*"),
+)
+# Routes that don't check stat requirements only need ownership + the collections
+EQUIPMENT_VIEW_OPTIONS = (load_only(Character.account_id), *GEAR_OPTIONS)
+
+# INSERT ... ON CONFLICT DO UPDATE constructs for the backends we run on
+UPSERT_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
 
 # ═══════════════════════════════════════════════════════════
 #  GET EQUIPMENT + INVENTORY
 # ═══════════════════════════════════════════════════════════
 
-@equipment_bp.route("/<character_id>/equipment", methods=["GET"])
+@equipment_bp.route("/<uuid:character_id>/equipment", methods=["GET"])
 @require_auth
 def get_equipment(character_id):
     """Return equipped items and full inventory."""
-    char = Character.query.filter_by(id=character_id, account_id=g.current_account.id).first()
+    char = _owned_character(character_id, *EQUIPMENT_VIEW_OPTIONS)
     if not char:
         return jsonify({"error": "Character not found."}), 404
 
@@ -35,7 +55,7 @@ def get_equipment(character_id):
 #  EQUIP ITEM
 # ═══════════════════════════════════════════════════════════
 
-@equipment_bp.route("/<character_id>/equip", methods=["POST"])
+@equipment_bp.route("/<uuid:character_id>/equip", methods=["POST"])
 @require_auth
 def equip_item(character_id):
     """
@@ -43,146 +63,128 @@ def equip_item(character_id):
     If slot is occupied, swap (old item goes back to inventory).
     Validates: ownership, item exists, correct slot, requirements met.
     """
-    char = Character.query.filter_by(id=character_id, account_id=g.current_account.id).first()
-    if not char:
-        return jsonify({"error": "Character not found."}), 404
-
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     item_id = data.get("item_id", "").strip()
     target_slot = data.get("slot", "").strip()
 
     if not item_id:
         return jsonify({"error": "item_id required."}), 400
 
-    # Verify item definition exists
-    item_def = ItemDefinition.query.get(item_id)
+    # Verify item definition exists (served from the process item cache)
+    item_def = item_definition_dict(item_id)
     if not item_def:
         return jsonify({"error": f"Item '{item_id}' not found."}), 404
 
-    # Verify character owns the item
-    inv_entry = CharacterInventory.query.filter_by(
-        character_id=char.id, item_id=item_id
-    ).first()
-    if not inv_entry or inv_entry.quantity < 1:
-        return jsonify({"error": "You don't own this item."}), 400
-
     # Determine slot
-    slot = target_slot or item_def.slot
+    slot = target_slot or item_def["slot"]
     if slot not in VALID_SLOTS:
         return jsonify({"error": f"Invalid slot: '{slot}'"}), 400
-    if item_def.slot and item_def.slot != slot:
-        return jsonify({"error": f"This item goes in '{item_def.slot}', not '{slot}'."}), 400
+    if item_def["slot"] and item_def["slot"] != slot:
+        return jsonify({"error": f"This item goes in '{item_def['slot']}', not '{slot}'."}), 400
+
+    # The request itself is valid — only now load the character and its gear
+    char = _owned_character(character_id, *GEAR_OPTIONS)
+    if not char:
+        return jsonify({"error": "Character not found."}), 404
+
+    # Verify character owns the item
+    inv_entry = _inventory_entry(char, item_id)
+    if not inv_entry or inv_entry.quantity < 1:
+        return jsonify({"error": "You don't own this item."}), 400
 
     # Check requirements
-    if item_def.required_level > 0 and char.character_level < item_def.required_level:
-        return jsonify({"error": f"Requires level {item_def.required_level} (you're {char.character_level})."}), 400
+    if item_def["required_level"] > 0 and char.character_level < item_def["required_level"]:
+        return jsonify({"error": f"Requires level {item_def['required_level']} (you're {char.character_level})."}), 400
 
-    if item_def.required_stat and item_def.required_stat_value > 0:
-        stat_val = getattr(char, item_def.required_stat, 0)
-        if stat_val < item_def.required_stat_value:
+    if item_def["required_stat"] and item_def["required_stat_value"] > 0:
+        stat_val = getattr(char, item_def["required_stat"], 0)
+        if stat_val < item_def["required_stat_value"]:
             return jsonify({
-                "error": f"Requires {item_def.required_stat} {item_def.required_stat_value} (you have {stat_val})."
+                "error": f"Requires {item_def['required_stat']} {item_def['required_stat_value']} (you have {stat_val})."
             }), 400
 
     # Unequip current item in that slot (if any)
-    current_equip = CharacterEquipment.query.filter_by(
-        character_id=char.id, slot=slot
-    ).first()
+    current_equip = _equipped_in(char, slot)
 
     if current_equip:
-        # Return old item to inventory
-        _add_to_inventory(char.id, current_equip.item_id, 1)
-        db.session.delete(current_equip)
+        # Return old item to inventory, then reuse the slot's row for the new item — a
+        # DELETE + INSERT pair would be flushed INSERT-first and trip uq_char_slot
+        _add_to_inventory(char, current_equip.item_id, 1)
+        current_equip.item_id = item_id  # onupdate restamps equipped_at
+    else:
+        char.equipment.append(CharacterEquipment(slot=slot, item_id=item_id))
 
     # Remove from inventory
     inv_entry.quantity -= 1
     if inv_entry.quantity <= 0:
-        db.session.delete(inv_entry)
+        char.inventory.remove(inv_entry)
 
-    # Equip new item
-    equip = CharacterEquipment(
-        character_id=char.id, slot=slot, item_id=item_id
-    )
-    db.session.add(equip)
-    db.session.commit()
-
-    return jsonify({
-        "message": f"Equipped {item_def.name} → {slot}",
-        "equipment": char.get_equipped_items(),
-        "inventory": char.get_inventory_list(),
-    }), 200
+    return _commit_with_gear(char, f"Equipped {item_def['name']} → {slot}")
 
 
 # ═══════════════════════════════════════════════════════════
 #  UNEQUIP ITEM
 # ═══════════════════════════════════════════════════════════
 
-@equipment_bp.route("/<character_id>/unequip", methods=["POST"])
+@equipment_bp.route("/<uuid:character_id>/unequip", methods=["POST"])
 @require_auth
 def unequip_item(character_id):
     """Unequip an item from a slot, return to inventory."""
-    char = Character.query.filter_by(id=character_id, account_id=g.current_account.id).first()
-    if not char:
-        return jsonify({"error": "Character not found."}), 404
-
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     slot = data.get("slot", "").strip()
 
     if slot not in VALID_SLOTS:
         return jsonify({"error": f"Invalid slot: '{slot}'"}), 400
 
-    equip = CharacterEquipment.query.filter_by(
-        character_id=char.id, slot=slot
-    ).first()
+    char = _owned_character(character_id, *EQUIPMENT_VIEW_OPTIONS)
+    if not char:
+        return jsonify({"error": "Character not found."}), 404
+
+    equip = _equipped_in(char, slot)
 
     if not equip:
         return jsonify({"error": f"Nothing equipped in {slot}."}), 400
 
     # Return to inventory
-    _add_to_inventory(char.id, equip.item_id, 1)
-    db.session.delete(equip)
-    db.session.commit()
+    _add_to_inventory(char, equip.item_id, 1)
+    char.equipment.remove(equip)
 
-    return jsonify({
-        "message": f"Unequipped {slot}",
-        "equipment": char.get_equipped_items(),
-        "inventory": char.get_inventory_list(),
-    }), 200
+    return _commit_with_gear(char, f"Unequipped {slot}")
 
 
 # ═══════════════════════════════════════════════════════════
 #  INVENTORY MANAGEMENT
 # ═══════════════════════════════════════════════════════════
 
-@equipment_bp.route("/<character_id>/inventory/add", methods=["POST"])
+@equipment_bp.route("/<uuid:character_id>/inventory/add", methods=["POST"])
 @require_auth
 def add_to_inventory(character_id):
     """Add items to inventory (admin/loot/quest reward)."""
-    char = Character.query.filter_by(id=character_id, account_id=g.current_account.id).first()
-    if not char:
-        return jsonify({"error": "Character not found."}), 404
-
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     item_id = data.get("item_id", "").strip()
     quantity = data.get("quantity", 1)
 
     if not item_id:
         return jsonify({"error": "item_id required."}), 400
 
-    item_def = ItemDefinition.query.get(item_id)
+    item_def = item_definition_dict(item_id)
     if not item_def:
         return jsonify({"error": f"Item '{item_id}' not found in catalog."}), 404
 
     if not isinstance(quantity, int) or quantity < 1:
         return jsonify({"error": "Quantity must be positive."}), 400
 
-    _add_to_inventory(char.id, item_id, quantity)
-    db.session.commit()
+    char = _owned_character(character_id, load_only(Character.account_id))
+    if not char:
+        return jsonify({"error": "Character not found."}), 404
 
-    return jsonify({
-        "message": f"+{quantity}× {item_def.name}",
-        "inventory": char.get_inventory_list(),
-    }), 200
+    _grant_items(char.id, item_id, quantity)
+    payload = {
+        "message": f"+{quantity}× {item_def['name']}",
+        "inventory": char.get_inventory_list(),  # first load — already sees the grant
+    }
+    db.session.commit()
+    return jsonify(payload), 200
 
 
 # ═══════════════════════════════════════════════════════════
@@ -197,32 +199,71 @@ def get_catalog():
     tier = request.args.get("tier", type=int)
     slot = request.args.get("slot")
 
-    query = ItemDefinition.query
-    if item_type:
-        query = query.filter_by(item_type=item_type)
-    if tier:
-        query = query.filter_by(tier=tier)
-    if slot:
-        query = query.filter_by(slot=slot)
+    if not (item_type or tier or slot):
+        # The common full listing — bytes encoded once per catalog load
+        return current_app.response_class(item_catalog_json(), mimetype="application/json"), 200
 
-    items = query.order_by(ItemDefinition.tier, ItemDefinition.name).all()
-    return jsonify({"items": [i.to_dict() for i in items]}), 200
+    # Filtered in Python over the cached, pre-serialized catalog — no query, no to_dict()
+    items = [
+        i for i in item_catalog()
+        if (not item_type or i["item_type"] == item_type)
+        and (not tier or i["tier"] == tier)
+        and (not slot or i["slot"] == slot)
+    ]
+    return jsonify({"items": items}), 200
 
 
 # ═══════════════════════════════════════════════════════════
 #  HELPERS
 # ═══════════════════════════════════════════════════════════
 
-def _add_to_inventory(character_id, item_id, quantity):
+def _owned_character(character_id, *options):
+    """The caller's character by primary key (identity-map hit if already loaded), else None."""
+    char = db.session.get(Character, character_id, options=options)
+    if char is None or char.account_id != g.current_account.id:
+        return None
+    return char
+
+
+def _inventory_entry(char, item_id):
+    """The character's stack of item_id from the loaded inventory, else None."""
+    return next((i for i in char.inventory if i.item_id == item_id), None)
+
+
+def _equipped_in(char, slot):
+    """The character's equipment row for slot from the loaded gear, else None."""
+    return next((e for e in char.equipment if e.slot == slot), None)
+
+
+def _add_to_inventory(char, item_id, quantity):
     """Add items to character inventory, stacking if already owned."""
-    entry = CharacterInventory.query.filter_by(
-        character_id=character_id, item_id=item_id
-    ).first()
+    entry = _inventory_entry(char, item_id)
 
     if entry:
         entry.quantity += quantity
     else:
-        entry = CharacterInventory(
-            character_id=character_id, item_id=item_id, quantity=quantity
-        )
-        db.session.add(entry)
+        char.inventory.append(CharacterInventory(item_id=item_id, quantity=quantity))
+
+
+def _grant_items(character_id, item_id, quantity):
+    """Stack quantity onto the character's item_id row, creating it if needed, as one
+    upsert — concurrent grants can neither lose counts nor collide on uq_char_item."""
+    insert = UPSERT_INSERT[db.session.get_bind().dialect.name]
+    stmt = insert(CharacterInventory).values(character_id=character_id, item_id=item_id, quantity=quantity)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=["character_id", "item_id"],
+        set_={"quantity": CharacterInventory.quantity + stmt.excluded.quantity},
+    ))
+
+
+def _commit_with_gear(char, message):
+    """Flush, serialize gear + inventory from the loaded collections, then commit —
+    after the commit every row is expired and reading them would reload both."""
+    db.session.flush()  # new equipment rows get equipped_at back via RETURNING
+    payload = {
+        "message": message,
+        "equipment": char.get_equipped_items(),
+        "inventory": char.get_inventory_list(),
+    }
+    db.session.commit()
+    return jsonify(payload), 200
@@ -2,20 +2,41 @@
 Real-time messaging and position sync via Flask-SocketIO.
 Handles proximity chat, global channels, admin whisper, and player positions.
 """
+import logging
 import math
 import jwt
 import os
+import threading
+import uuid
+from collections import Counter
 from flask import request
-from flask_socketio import SocketIO, emit, disconnect
+from flask_socketio import SocketIO, emit, disconnect, join_room, leave_room
+from sqlalchemy.orm import load_only
 
 from database import db
 from models import Account, Character
+from routes.auth import decode_token
 
-socketio = SocketIO(cors_allowed_origins="*", async_mode="threading")
+# Connect/join/leave traces — debug level, so they cost nothing unless logging is turned up
+log = logging.getLogger(__name__)
+
+# "threading" for `python app.py`; wsgi.py switches this to "gevent" for gunicorn
+ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "threading")
+socketio = SocketIO(cors_allowed_origins="*", async_mode=ASYNC_MODE)
+
+# Workers without the socketio feature never init `socketio`; given REDIS_URL they get this
+# write-only client instead, which publishes emits for the Socket.IO worker to deliver
+publisher = None
+
+
+def init_publisher(message_queue):
+    global publisher
+    publisher = SocketIO(message_queue=message_queue, async_mode=ASYNC_MODE)
 
 # ═══════════════════════════════════════════════════════════
 #  CONNECTED PLAYER STATE
 # ═══════════════════════════════════════════════════════════
+# Everything below is per-process — Socket.IO runs on a single worker (SETUP.md)
 
 # sid → player info
 connected_players = {}
@@ -23,6 +44,24 @@ connected_players = {}
 # character_id → sid (reverse lookup for admin whisper targeting)
 char_to_sid = {}
 
+# character name → sid (admin whisper targets players by name)
+name_to_sid = {}
+
+# sids that have joined the world, and how many of them hold each allegiance —
+# lets channel chat skip building/emitting a packet nobody would receive
+in_world_sids = set()
+allegiance_counts = Counter()
+
+# (cell_x, cell_y) → sids of in-world players in that grid cell. Cells are as wide as
+# the longest chat range, so everyone in range is in the sender's cell or a neighbour.
+grid = {}
+
+# character_id → latest {"id", "x", "y"} since the last tick; flushed as one player_moved_batch
+pending_moves = {}
+POSITION_TICK = 0.1  # seconds — matches the client's send rate
+_flusher_lock = threading.Lock()
+_flusher_started = False
+
 # Chat ranges in pixels (tile = 32px)
 TILE_PX = 32
 CHAT_RANGES = {
@@ -33,31 +72,114 @@ CHAT_RANGES = {
     "story": 10 * TILE_PX,     # 320px
 }
 
+# Squared, so range checks compare dx² + dy² without a sqrt
+CHAT_RANGES_SQ = {chat_type: px * px for chat_type, px in CHAT_RANGES.items()}
+CELL_PX = max(CHAT_RANGES.values())
+
+MAX_CHAT_LENGTH = 2000
+
 # Ranks that can SEND faction chat
 FACTION_SEND_RANKS = {"Banneret", "Justicar"}
 
+# Socket.IO rooms: every in-world player is in WORLD_ROOM plus their allegiance's room (if any),
+# so channel broadcasts are one emit (encoded once, fanned out by Socket.IO / Redis)
+WORLD_ROOM = "world"
+
+
+def faction_room(allegiance):
+    return f"faction:{allegiance}"
+
+
+def local_recipients_only():
+    """True when Socket.IO runs here without a message queue — every socket is on this process,
+    so the counts above are complete."""
+    return socketio.server is not None and socketio.server_options.get("message_queue") is None
+
+
+def count_in_world(sid, player):
+    in_world_sids.add(sid)
+    allegiance_counts[player["allegiance"]] += 1
+
 
-def distance(x1, y1, x2, y2):
-    return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+def uncount_in_world(sid, player):
+    if sid in in_world_sids:
+        in_world_sids.discard(sid)
+        allegiance_counts[player["allegiance"]] -= 1
+        if not allegiance_counts[player["allegiance"]]:
+            del allegiance_counts[player["allegiance"]]
 
 
-def players_in_range(sender_sid, range_px):
-    """Yield SIDs of players within range of sender."""
+def read_position(data, x, y):
+    """(x, y) from a client packet, defaulting to the given values; None unless both are finite numbers."""
+    try:
+        x, y = float(data.get("x", x)), float(data.get("y", y))
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(x) and math.isfinite(y)):
+        return None
+    return x, y
+
+
+def place_in_grid(sid, player):
+    """File the player under the grid cell of their current position."""
+    cell = (int(player["x"] // CELL_PX), int(player["y"] // CELL_PX))
+    if cell == player.get("cell"):
+        return
+    remove_from_grid(sid, player)
+    grid.setdefault(cell, set()).add(sid)
+    player["cell"] = cell
+
+
+def remove_from_grid(sid, player):
+    cell = player.pop("cell", None)
+    if cell is not None:
+        members = grid[cell]
+        members.discard(sid)
+        if not members:
+            del grid[cell]
+
+
+def players_in_range(sender_sid, range_sq):
+    """Yield SIDs of in-world players within range of sender — only the sender's
+    grid cell and its 8 neighbours are checked, not every connected player."""
     sender = connected_players.get(sender_sid)
-    if not sender:
+    if not sender or "cell" not in sender:
         return
     sx, sy = sender["x"], sender["y"]
-    for sid, p in connected_players.items():
-        if sid == sender_sid:
-            continue
-        if distance(sx, sy, p["x"], p["y"]) <= range_px:
-            yield sid
+    cx, cy = sender["cell"]
+    for gx in (cx - 1, cx, cx + 1):
+        for gy in (cy - 1, cy, cy + 1):
+            for sid in grid.get((gx, gy), ()):
+                if sid == sender_sid:
+                    continue
+                p = connected_players[sid]
+                dx, dy = p["x"] - sx, p["y"] - sy
+                if dx * dx + dy * dy <= range_sq:
+                    yield sid
+
+
+def flush_positions():
+    """Send every position that changed since the last tick as one batch to the world room."""
+    global pending_moves
+    if not pending_moves:
+        return
+    batch, pending_moves = pending_moves, {}
+    socketio.emit("player_moved_batch", list(batch.values()), to=WORLD_ROOM)
 
 
-def all_other_sids(exclude_sid):
-    for sid in connected_players:
-        if sid != exclude_sid:
-            yield sid
+def position_flusher():
+    while True:
+        socketio.sleep(POSITION_TICK)
+        flush_positions()
+
+
+def ensure_position_flusher():
+    """Start the tick loop once per process, on the first connection."""
+    global _flusher_started
+    with _flusher_lock:
+        if not _flusher_started:
+            _flusher_started = True
+            socketio.start_background_task(position_flusher)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -65,15 +187,15 @@ def all_other_sids(exclude_sid):
 # ═══════════════════════════════════════════════════════════
 
 def verify_token(token):
-    """Verify JWT and return account or None."""
+    """Verify JWT and return account or None. Shares the REST routes' decoded-token cache,
+    so reconnects skip the HMAC; the account row is still read fresh."""
     try:
-        secret = os.getenv("SECRET_KEY", "dev-secret-change-me")
-        payload = jwt.decode(token, secret, algorithms=["HS256"])
-        account_id = payload.get("account_id")
+        payload = decode_token(token)
+        account_id = payload.get("sub")
         if not account_id:
             return None
-        return Account.query.get(account_id)
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
+        return db.session.get(Account, uuid.UUID(account_id))
+    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, ValueError):
         return None
 
 
@@ -97,6 +219,8 @@ def handle_connect(auth=None):
         disconnect()
         return
 
+    ensure_position_flusher()
+
     # Store minimal auth info — full data comes on join_world
     connected_players[request.sid] = {
         "account_id": account.id,
@@ -108,7 +232,7 @@ def handle_connect(auth=None):
         "x": 0.0,
         "y": 0.0,
     }
-    print(f"[Socket] Connected: {account.username} (sid={request.sid})")
+    log.debug("[Socket] Connected: %s (sid=%s)", account.username, request.sid)
 
 
 @socketio.on("disconnect")
@@ -117,10 +241,14 @@ def handle_disconnect():
     player = connected_players.pop(request.sid, None)
     if player and player.get("character_id"):
         char_to_sid.pop(player["character_id"], None)
-        # Notify others
-        for sid in list(connected_players.keys()):
-            emit("player_left", {"id": player["character_id"]}, to=sid)
-        print(f"[Socket] Disconnected: {player.get('name', '?')}")
+        if name_to_sid.get(player["name"]) == request.sid:
+            del name_to_sid[player["name"]]
+        pending_moves.pop(player["character_id"], None)
+        remove_from_grid(request.sid, player)
+        uncount_in_world(request.sid, player)
+        # Notify others in the world
+        emit("player_left", {"id": player["character_id"]}, to=WORLD_ROOM, skip_sid=request.sid)
+        log.debug("[Socket] Disconnected: %s", player.get("name", "?"))
 
 
 @socketio.on("join_world")
@@ -134,71 +262,97 @@ def handle_join_world(data):
     character_id = data.get("character_id")
     if not character_id:
         return
+    position = read_position(data, 0.0, 0.0)
+    if position is None:
+        return
 
-    character = Character.query.get(character_id)
+    try:
+        # Only the columns the overworld needs — skips bio/play_by_path and the stat block
+        character = db.session.get(
+            Character, uuid.UUID(str(character_id)),
+            options=(load_only(Character.account_id, Character.name, Character.rp_rank, Character.allegiance),),
+        )
+    except ValueError:
+        return
     if not character or character.account_id != player["account_id"]:
         return
 
-    # Update player state
-    player["character_id"] = character.id
+    previous_allegiance = player["allegiance"]
+    uncount_in_world(sid, player)
+    if player["name"] and name_to_sid.get(player["name"]) == sid:
+        del name_to_sid[player["name"]]
+    # Update player state (ids kept as strings — they go straight into JSON payloads)
+    player["character_id"] = str(character.id)
     player["name"] = character.name
     player["rank"] = character.rp_rank or "Aspirant"
     player["allegiance"] = character.allegiance or "None"
-    player["x"] = float(data.get("x", 0))
-    player["y"] = float(data.get("y", 0))
-
-    char_to_sid[character.id] = sid
-
-    # Tell this player about all other players already in world
-    for other_sid, other in connected_players.items():
-        if other_sid == sid or not other.get("character_id"):
+    player["x"], player["y"] = position
+    player["sent"] = (round(player["x"]), round(player["y"]))
+
+    char_to_sid[player["character_id"]] = sid
+    name_to_sid[character.name] = sid
+    place_in_grid(sid, player)
+    count_in_world(sid, player)
+
+    # Switching characters moves the socket to the new allegiance's faction room
+    if previous_allegiance != player["allegiance"]:
+        if previous_allegiance not in (None, "None"):
+            leave_room(faction_room(previous_allegiance))
+        if player["allegiance"] != "None":
+            join_room(faction_room(player["allegiance"]))
+    join_room(WORLD_ROOM)
+
+    # Tell this player about all other players already in world — one array, one frame
+    snapshot = []
+    for other_sid in in_world_sids:
+        if other_sid == sid:
             continue
-        emit("player_joined", {
+        other = connected_players[other_sid]
+        snapshot.append({
             "id": other["character_id"],
             "name": other["name"],
             "rank": other["rank"],
             "allegiance": other["allegiance"],
             "x": other["x"],
             "y": other["y"],
-        }, to=sid)
+        })
+    if snapshot:
+        emit("world_snapshot", snapshot, to=sid)
 
     # Tell all other players about this player
     join_data = {
-        "id": character.id,
+        "id": player["character_id"],
         "name": character.name,
         "rank": player["rank"],
         "allegiance": player["allegiance"],
         "x": player["x"],
         "y": player["y"],
     }
-    for other_sid in all_other_sids(sid):
-        if connected_players[other_sid].get("character_id"):
-            emit("player_joined", join_data, to=other_sid)
+    emit("player_joined", join_data, to=WORLD_ROOM, skip_sid=sid)
 
-    print(f"[Socket] {character.name} joined world at ({player['x']:.0f}, {player['y']:.0f})")
+    log.debug("[Socket] %s joined world at (%.0f, %.0f)", character.name, player["x"], player["y"])
 
 
 @socketio.on("position")
 def handle_position(data):
-    """Update player position. Broadcast to nearby players."""
+    """Update player position. Queued for the next tick's player_moved_batch."""
     sid = request.sid
     player = connected_players.get(sid)
     if not player or not player.get("character_id"):
         return
 
-    player["x"] = float(data.get("x", player["x"]))
-    player["y"] = float(data.get("y", player["y"]))
-
-    move_data = {
-        "id": player["character_id"],
-        "x": player["x"],
-        "y": player["y"],
-    }
+    position = read_position(data, player["x"], player["y"])
+    if position is None:
+        return
+    player["x"], player["y"] = position
+    place_in_grid(sid, player)
 
-    # Broadcast to all other players (client can cull by distance)
-    for other_sid in all_other_sids(sid):
-        if connected_players[other_sid].get("character_id"):
-            emit("player_moved", move_data, to=other_sid)
+    # Broadcast in whole pixels, and only when that changed — sub-pixel jitter sends nothing.
+    # Latest position wins; every in-world player gets it on the next tick (client can cull by distance)
+    sent = (round(player["x"]), round(player["y"]))
+    if sent != player["sent"]:
+        player["sent"] = sent
+        pending_moves[player["character_id"]] = {"id": player["character_id"], "x": sent[0], "y": sent[1]}
 
 
 @socketio.on("chat")
@@ -210,12 +364,18 @@ def handle_chat(data):
         return
 
     msg_type = data.get("type", "say").lower()
-    text = data.get("text", "").strip()
-    target = data.get("target")  # for admin whisper
-    color = data.get("color")    # sender's IC color
+    handler = CHAT_HANDLERS.get(msg_type)
+    if handler is None:
+        return
 
-    if not text or len(text) > 2000:
+    # Length-check the raw string first — oversized packets are dropped without copying them
+    raw_text = data.get("text", "")
+    if not isinstance(raw_text, str) or len(raw_text) > MAX_CHAT_LENGTH:
+        return
+    text = raw_text.strip()
+    if not text:
         return
+    color = data.get("color")    # sender's IC color
 
     chat_payload = {
         "sender": player["name"],
@@ -226,71 +386,81 @@ def handle_chat(data):
     if color:
         chat_payload["color"] = color
 
-    # ── PROXIMITY CHAT ──
-    if msg_type in CHAT_RANGES:
-        range_px = CHAT_RANGES[msg_type]
-        for target_sid in players_in_range(sid, range_px):
-            emit("chat", chat_payload, to=target_sid)
+    handler(sid, player, chat_payload, data)
+
+
+# ─── CHAT CHANNELS ───────────────────────────────────────────
+# Each takes (sid, player, chat_payload, data); data is the raw packet (admin whisper reads "target")
+
+def chat_proximity(sid, player, chat_payload, data):
+    """say / whisper / yell / emote / story — players within the type's range."""
+    # One emit addressed to every nearby sid — the packet is encoded once, not per listener
+    nearby = list(players_in_range(sid, CHAT_RANGES_SQ[chat_payload["type"]]))
+    if nearby:
+        emit("chat", chat_payload, to=nearby)
+
+
+def alone_in_world():
+    """Nobody else in the world → channel messages have no audience."""
+    return local_recipients_only() and len(in_world_sids) <= 1
+
+
+def chat_ooc(sid, player, chat_payload, data):
+    """Global out-of-character chat."""
+    if alone_in_world():
+        return
+    emit("chat", chat_payload, to=WORLD_ROOM, skip_sid=sid)
+
+
+def chat_faction(sid, player, chat_payload, data):
+    """Same allegiance, rank-gated for sending."""
+    # Only Banneret+ can send
+    if player["rank"] not in FACTION_SEND_RANKS:
+        emit("chat_error", {"error": "Only Banneret and above can use Faction chat."}, to=sid)
         return
 
-    # ── OOC (global) ──
-    if msg_type == "ooc":
-        for target_sid in all_other_sids(sid):
-            if connected_players[target_sid].get("character_id"):
-                emit("chat", chat_payload, to=target_sid)
+    sender_allegiance = player["allegiance"]
+    if not sender_allegiance or sender_allegiance == "None":
+        emit("chat_error", {"error": "You have no faction allegiance."}, to=sid)
         return
 
-    # ── FACTION (same allegiance, rank-gated for sending) ──
-    if msg_type == "faction":
-        # Only Banneret+ can send
-        if player["rank"] not in FACTION_SEND_RANKS:
-            emit("chat_error", {"error": "Only Banneret and above can use Faction chat."}, to=sid)
-            return
-
-        sender_allegiance = player["allegiance"]
-        if not sender_allegiance or sender_allegiance == "None":
-            emit("chat_error", {"error": "You have no faction allegiance."}, to=sid)
-            return
-
-        for target_sid, target_player in connected_players.items():
-            if target_sid == sid:
-                continue
-            if not target_player.get("character_id"):
-                continue
-            # Same allegiance can READ faction chat (any rank)
-            if target_player.get("allegiance") == sender_allegiance:
-                emit("chat", chat_payload, to=target_sid)
+    # Same allegiance can READ faction chat (any rank)
+    if local_recipients_only() and allegiance_counts[sender_allegiance] <= 1:
         return
+    emit("chat", chat_payload, to=faction_room(sender_allegiance), skip_sid=sid)
+
 
-    # ── ADMIN WHISPER (direct to target character) ──
-    if msg_type == "admin_whisper":
-        if not player.get("is_admin"):
-            return
-        if not target:
-            return
-
-        # Find target by character name
-        target_sid = None
-        for check_sid, check_player in connected_players.items():
-            if check_player.get("name") == target:
-                target_sid = check_sid
-                break
-
-        if target_sid:
-            chat_payload["target"] = target
-            emit("chat", chat_payload, to=target_sid)
-        else:
-            emit("chat_error", {"error": f"Player '{target}' not online."}, to=sid)
+def chat_admin_whisper(sid, player, chat_payload, data):
+    """Direct to a target character, by name."""
+    target = data.get("target")
+    if not player.get("is_admin"):
         return
+    if not target:
+        return
+
+    target_sid = name_to_sid.get(target)
+    if target_sid:
+        chat_payload["target"] = target
+        emit("chat", chat_payload, to=target_sid)
+    else:
+        emit("chat_error", {"error": f"Player '{target}' not online."}, to=sid)
 
-    # ── ANNOUNCE (admin broadcast) ──
-    if msg_type == "announce":
-        if not player.get("is_admin"):
-            return
-        for target_sid in all_other_sids(sid):
-            if connected_players[target_sid].get("character_id"):
-                emit("chat", chat_payload, to=target_sid)
+
+def chat_announce(sid, player, chat_payload, data):
+    """Admin broadcast to everyone in the world."""
+    if not player.get("is_admin") or alone_in_world():
         return
+    emit("chat", chat_payload, to=WORLD_ROOM, skip_sid=sid)
+
+
+# msg type → channel handler; unknown types are dropped before the payload is built
+CHAT_HANDLERS = {
+    **dict.fromkeys(CHAT_RANGES, chat_proximity),
+    "ooc": chat_ooc,
+    "faction": chat_faction,
+    "admin_whisper": chat_admin_whisper,
+    "announce": chat_announce,
+}
 
 
 # ═══════════════════════════════════════════════════════════
@@ -298,13 +468,20 @@ def handle_chat(data):
 # ═══════════════════════════════════════════════════════════
 
 def broadcast_announcement(text, admin_name):
-    """Called from admin HTTP route to push announcement via socket."""
+    """Called from admin HTTP route to push announcement via socket. Returns False when this
+    process can't deliver it — no Socket.IO here and no REDIS_URL to publish through."""
     payload = {
         "sender": "SERVER",
         "sender_id": "",
         "text": text,
         "type": "announce",
     }
-    for sid, player in connected_players.items():
-        if player.get("character_id"):
-            socketio.emit("chat", payload, to=sid)
+    if socketio.server is None:
+        if publisher is None:
+            return False
+        publisher.emit("chat", payload, to=WORLD_ROOM)
+        return True
+    if local_recipients_only() and not in_world_sids:
+        return True
+    socketio.emit("chat", payload, to=WORLD_ROOM)
+    return True
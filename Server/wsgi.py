@@ -0,0 +1,20 @@
+"""
+Production entry point — gunicorn with gevent workers.
+
+    gunicorn -k geventwebsocket.gunicorn.workers.GeventWebSocketWorker -w 1 -b 0.0.0.0:5000 wsgi:app
+
+Monkey-patching must happen before anything imports socket/threading,
+and psycogreen makes psycopg2 yield to other greenlets while it waits on Postgres.
+"""
+from gevent import monkey
+monkey.patch_all()
+
+from psycogreen.gevent import patch_psycopg
+patch_psycopg()
+
+import os
+os.environ.setdefault("SOCKETIO_ASYNC_MODE", "gevent")
+
+from app import create_app
+
+app = create_app()